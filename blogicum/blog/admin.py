@@ -1,6 +1,64 @@
 from django.contrib import admin
-from .models import Category, Post, Location
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from .deletion import delete_posts, delete_user
+from .models import Category, Job, Post, Location
+
+User = get_user_model()
 
 admin.site.register(Category)
-admin.site.register(Post)
 admin.site.register(Location)
+
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    actions = ['delete_fast']
+
+    def delete_model(self, request, obj):
+        delete_posts([obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        delete_posts(queryset.values_list('pk', flat=True))
+
+    @admin.action(description='Удалить без списка связанных объектов',
+                  permissions=['delete'])
+    def delete_fast(self, request, queryset):
+        # Страница подтверждения стандартного удаления загружает все
+        # комментарии постов, чтобы их перечислить.
+        deleted = delete_posts(queryset.values_list('pk', flat=True))
+        self.message_user(request, f'Удалено постов: {deleted}')
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class BlogUserAdmin(UserAdmin):
+    actions = ['delete_fast']
+
+    def delete_model(self, request, obj):
+        delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            delete_user(user)
+
+    @admin.action(description='Удалить без списка связанных объектов',
+                  permissions=['delete'])
+    def delete_fast(self, request, queryset):
+        users = list(queryset)
+        for user in users:
+            delete_user(user)
+        self.message_user(request, f'Удалено пользователей: {len(users)}')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'status', 'attempts', 'run_after',
+                    'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = [field.name for field in Job._meta.fields]
+
+    def has_add_permission(self, request):
+        # Задачи ставит в очередь код (blog.jobs.enqueue), а не админка.
+        return False
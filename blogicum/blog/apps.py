@@ -5,3 +5,11 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import checks, signals, tasks  # noqa: F401
+        from .db import configure_sqlite
+
+        connection_created.connect(configure_sqlite)
@@ -0,0 +1,149 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from .instrumentation import record_cache
+
+# Параметры запроса, от которых зависит содержимое кэшируемых страниц.
+PAGE_CACHE_PARAMS = ('page', 'cursor')
+
+
+def get_cache():
+    return caches[settings.POST_CARD_CACHE]
+
+
+def _tag_key(tag):
+    return f'blog:tag:{tag}'
+
+
+def tag_versions(tags):
+    """Текущие версии тегов.
+
+    Тег без версии (ещё не задана или вытеснена из кэша) получает новую,
+    поэтому записи, сохранённые под старой версией, больше не читаются.
+    """
+    cache = get_cache()
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def versioned_key(prefix, tags, *parts):
+    stamp = ':'.join(str(version) for version in tag_versions(tags))
+    digest = hashlib.md5(stamp.encode()).hexdigest()
+    return ':'.join(['blog', prefix, *map(str, parts), digest])
+
+
+def invalidate(*tags):
+    get_cache().set_many(
+        {_tag_key(tag): time.time_ns() for tag in tags}, None)
+
+
+def invalidate_on_commit(*tags):
+    # Сразу и ещё раз после коммита: иначе параллельный запрос может
+    # успеть закэшировать данные, прочитанные до фиксации транзакции.
+    invalidate(*tags)
+    transaction.on_commit(lambda: invalidate(*tags))
+
+
+def post_card_tags(post):
+    return [
+        f'post:{post.pk}',
+        f'category:{post.category_id}',
+        f'location:{post.location_id}',
+        f'user:{post.author_id}',
+    ]
+
+
+def render_card(template_name, post):
+    """Карточка поста (или записи ленты) из кэша фрагментов."""
+    cache = get_cache()
+    key = versioned_key(template_name, post_card_tags(post), post.pk)
+    html = cache.get(key)
+    record_cache(html is not None)
+    if html is None:
+        html = render_to_string(template_name, {'post': post})
+        cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return html
+
+
+def render_post_card(post):
+    return render_card('includes/post_card.html', post)
+
+
+def render_feed_card(entry):
+    return render_card('includes/feed_card.html', entry)
+
+
+def with_cache_tags(response, *tags):
+    response.cache_tags = tags
+    return response
+
+
+def page_cache_key(request):
+    params = '&'.join(
+        f'{name}={request.GET.get(name)}'
+        for name in PAGE_CACHE_PARAMS if name in request.GET
+    )
+    digest = hashlib.md5(f'{request.path}?{params}'.encode()).hexdigest()
+    return f'blog:page:{digest}'
+
+
+def page_cache_timeout():
+    """Срок жизни страницы — не дольше, чем до ближайшей публикации."""
+    from .visibility import next_publication
+
+    timeout = settings.ANONYMOUS_PAGE_CACHE_TIMEOUT
+    moment = next_publication()
+    if moment is not None:
+        seconds = (moment - timezone.now()).total_seconds()
+        timeout = min(timeout, int(seconds))
+    return timeout
+
+
+def anonymous_page_cache(view):
+    """Кэширует страницы целиком для анонимных посетителей.
+
+    Представление помечает ответ тегами через ``with_cache_tags``; запись
+    считается устаревшей, как только версия любого из её тегов изменится.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (not settings.ANONYMOUS_PAGE_CACHE
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return view(request, *args, **kwargs)
+        cache = get_cache()
+        key = page_cache_key(request)
+        entry = cache.get(key)
+        fresh = entry is not None and tag_versions(entry[0]) == entry[1]
+        record_cache(fresh)
+        if fresh:
+            _, _, content, headers = entry
+            response = HttpResponse(content)
+            for header, value in headers:
+                response[header] = value
+            return response
+        response = view(request, *args, **kwargs)
+        tags = getattr(response, 'cache_tags', None)
+        if (tags and response.status_code == 200
+                and not response.streaming and not response.cookies):
+            patch_vary_headers(response, ('Cookie',))
+            timeout = page_cache_timeout()
+            if timeout > 0:
+                cache.set(key, (tags, tag_versions(tags), response.content,
+                                list(response.items())), timeout)
+        return response
+    return wrapper
@@ -0,0 +1,117 @@
+"""Проверки настроек, замедляющих работу в боевом профиле."""
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+DEBUG_PROCESSOR = 'django.template.context_processors.debug'
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+INSECURE_KEY_PREFIX = 'django-insecure-'
+
+
+def uses_cached_loader(template_settings):
+    loaders = template_settings.get('OPTIONS', {}).get('loaders') or []
+    return any(
+        (loader[0] if isinstance(loader, (list, tuple)) else loader)
+        == CACHED_LOADER
+        for loader in loaders
+    )
+
+
+@register(Tags.security)
+def check_secret_key(app_configs, **kwargs):
+    if settings.DEBUG or not settings.SECRET_KEY.startswith(
+            INSECURE_KEY_PREFIX):
+        return []
+    return [Error(
+        'SECRET_KEY — ключ для разработки из репозитория, а DEBUG выключен.',
+        hint='Задайте свой ключ в DJANGO_SECRET_KEY.',
+        id='blog.E001',
+    )]
+
+
+def check_debug():
+    if not settings.DEBUG:
+        return []
+    return [Warning(
+        'DEBUG включён: Django хранит текст каждого SQL-запроса.',
+        hint='Уберите DJANGO_DEBUG=1.',
+        id='blog.W001',
+    )]
+
+
+def check_templates():
+    messages = []
+    for template_settings in settings.TEMPLATES:
+        options = template_settings.get('OPTIONS', {})
+        if not uses_cached_loader(template_settings):
+            messages.append(Warning(
+                'Шаблоны читаются и разбираются заново при каждом рендеринге.',
+                hint=f'Подключите {CACHED_LOADER} в OPTIONS["loaders"].',
+                id='blog.W002',
+            ))
+        if DEBUG_PROCESSOR in options.get('context_processors', []):
+            messages.append(Warning(
+                f'Подключён контекстный процессор {DEBUG_PROCESSOR}.',
+                id='blog.W003',
+            ))
+    return messages
+
+
+def check_cache():
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кэш по умолчанию не общий для процессов: карточки, страницы '
+        'и версии тегов у каждого процесса свои.',
+        hint='Задайте DJANGO_CACHE_BACKEND.',
+        id='blog.W004',
+    )]
+
+
+def check_databases():
+    return [
+        Warning(
+            f'Соединение с БД {alias!r} открывается на каждый запрос.',
+            hint='Задайте DJANGO_CONN_MAX_AGE больше нуля.',
+            id='blog.W005',
+        )
+        for alias, database in settings.DATABASES.items()
+        if not database.get('CONN_MAX_AGE')
+    ]
+
+
+def check_sessions():
+    if settings.SESSION_ENGINE != 'django.contrib.sessions.backends.db':
+        return []
+    return [Warning(
+        'Сессия читается из БД при каждом запросе.',
+        hint='Используйте django.contrib.sessions.backends.cached_db.',
+        id='blog.W006',
+    )]
+
+
+def check_server_timing():
+    if settings.SERVER_TIMING_SAMPLE_RATE < 1:
+        return []
+    return [Warning(
+        'Замеряется каждый запрос.',
+        hint='Уменьшите SERVER_TIMING_SAMPLE_RATE.',
+        id='blog.W007',
+    )]
+
+
+@register('performance')
+def check_production_settings(app_configs, **kwargs):
+    if getattr(settings, 'SETTINGS_PROFILE', 'dev') != 'prod':
+        return []
+    return [
+        *check_debug(),
+        *check_templates(),
+        *check_cache(),
+        *check_databases(),
+        *check_sessions(),
+        *check_server_timing(),
+    ]
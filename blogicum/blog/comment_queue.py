@@ -0,0 +1,186 @@
+"""Отложенная запись комментариев (включается COMMENT_WRITE_BEHIND).
+
+Проверенный формой комментарий дописывается строкой JSON в журнал на
+диске, а не в БД: при всплеске комментариев запросы не ждут друг друга
+на блокировке записи SQLite. Команда ``flush_comments`` забирает журнал
+и вставляет комментарии пачками, по транзакции на пачку.
+
+Пока комментарий не записан в БД, автор видит его под постом: очередь
+автора по каждому посту хранится в кэше.
+"""
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import get_cache, invalidate, invalidate_on_commit
+from .db import insert_rows
+from .feed import adjust_comment_count
+from .models import Comment, Post
+
+User = get_user_model()
+
+try:
+    import fcntl
+except ImportError:  # Windows: журнал пишет один процесс.
+    fcntl = None
+
+JOURNAL_NAME = 'journal.ndjson'
+SEGMENT_PREFIX = 'segment-'
+# Сколько автор видит свой ещё не записанный комментарий, если
+# flush_comments не запущена.
+PENDING_TIMEOUT = 24 * 60 * 60
+
+
+def is_enabled():
+    return settings.COMMENT_WRITE_BEHIND
+
+
+def _path(name):
+    return os.path.join(settings.COMMENT_QUEUE_DIR, name)
+
+
+@contextmanager
+def _locked():
+    """Исключительная блокировка журнала между процессами."""
+    os.makedirs(settings.COMMENT_QUEUE_DIR, exist_ok=True)
+    with open(_path('journal.lock'), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _pending_key(post_id, author_id):
+    return f'blog:pending-comments:{post_id}:{author_id}'
+
+
+def enqueue(post, author, text):
+    """Дописывает комментарий в журнал; возвращает запись журнала."""
+    entry = {
+        'id': uuid.uuid4().hex,
+        'post_id': post.pk,
+        'author_id': author.pk,
+        'text': text,
+        'created_at': timezone.now().isoformat(),
+    }
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    with _locked(), open(_path(JOURNAL_NAME), 'a',
+                         encoding='utf-8') as journal:
+        journal.write(line)
+        journal.flush()
+        os.fsync(journal.fileno())
+    cache = get_cache()
+    key = _pending_key(post.pk, author.pk)
+    cache.set(key, cache.get(key, []) + [entry], PENDING_TIMEOUT)
+    # Новая версия тега меняет ETag страницы поста.
+    invalidate(f'post:{post.pk}')
+    return entry
+
+
+def pending_comments(post, user):
+    """Ещё не записанные в БД комментарии пользователя к посту."""
+    if not is_enabled() or not user.is_authenticated:
+        return []
+    return [
+        Comment(post=post, author=user, text=entry['text'],
+                created_at=parse_datetime(entry['created_at']))
+        for entry in get_cache().get(_pending_key(post.pk, user.pk), [])
+    ]
+
+
+def _forget(entries):
+    cache = get_cache()
+    done = {entry['id'] for entry in entries}
+    keys = {_pending_key(entry['post_id'], entry['author_id'])
+            for entry in entries}
+    for key in keys:
+        left = [entry for entry in cache.get(key, [])
+                if entry['id'] not in done]
+        if left:
+            cache.set(key, left, PENDING_TIMEOUT)
+        else:
+            cache.delete(key)
+
+
+def _rotate():
+    """Переименовывает журнал в сегмент; возвращает сегменты по порядку.
+
+    Сегменты, оставшиеся от прерванного запуска, тоже возвращаются.
+    """
+    with _locked():
+        if os.path.exists(_path(JOURNAL_NAME)):
+            os.replace(_path(JOURNAL_NAME),
+                       _path(f'{SEGMENT_PREFIX}{time.time_ns()}.ndjson'))
+    return sorted(name for name in os.listdir(settings.COMMENT_QUEUE_DIR)
+                  if name.startswith(SEGMENT_PREFIX))
+
+
+def _read(name):
+    entries = []
+    with open(_path(name), encoding='utf-8') as segment:
+        for line in segment:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Недописанная строка: процесс упал во время записи.
+                continue
+    return entries
+
+
+def _write_batch(entries):
+    """Вставляет пачку; возвращает число вставленных комментариев."""
+    post_ids = {entry['post_id'] for entry in entries}
+    existing_posts = set(Post.objects.filter(pk__in=post_ids)
+                         .values_list('pk', flat=True))
+    existing_users = set(User.objects.filter(
+        pk__in={entry['author_id'] for entry in entries}
+    ).values_list('pk', flat=True))
+    # Сегмент мог быть уже записан запуском, прерванным до его удаления.
+    written = set(Comment.objects.filter(
+        post__in=existing_posts,
+        created_at__in=[parse_datetime(entry['created_at'])
+                        for entry in entries],
+    ).values_list('post_id', 'author_id', 'created_at'))
+    adapt = connection.ops.adapt_datetimefield_value
+    rows, counts = [], {}
+    for entry in entries:
+        created_at = parse_datetime(entry['created_at'])
+        if (entry['post_id'] not in existing_posts
+                or entry['author_id'] not in existing_users
+                or (entry['post_id'], entry['author_id'],
+                    created_at) in written):
+            continue
+        rows.append((entry['post_id'], entry['author_id'], entry['text'],
+                     adapt(created_at)))
+        counts[entry['post_id']] = counts.get(entry['post_id'], 0) + 1
+    with transaction.atomic():
+        insert_rows(Comment, ['post', 'author', 'text', 'created_at'], rows)
+        for post_id, count in counts.items():
+            adjust_comment_count(post_id, count)
+        invalidate_on_commit('feed', *(f'post:{pk}' for pk in counts))
+        transaction.on_commit(lambda: _forget(entries))
+    return len(rows)
+
+
+def flush(batch_size=500):
+    """Записывает в БД всё, что накопилось в журнале."""
+    if not os.path.isdir(settings.COMMENT_QUEUE_DIR):
+        return 0
+    total = 0
+    for name in _rotate():
+        entries = _read(name)
+        for start in range(0, len(entries), batch_size):
+            total += _write_batch(entries[start:start + batch_size])
+        os.remove(_path(name))
+    return total
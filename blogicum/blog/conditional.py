@@ -0,0 +1,59 @@
+"""Валидаторы для условных GET-запросов (ETag).
+
+ETag складывается из версий тегов кэша (их обновляют сигналы моделей и
+наступление отложенных публикаций), даты последнего комментария и того,
+кто смотрит страницу: авторизованному пользователю страницы показываются
+иначе. Last-Modified не отдаётся — у постов нет даты изменения, и по ней
+правка поста осталась бы незамеченной.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Max
+from django.views.decorators.http import condition
+
+from .cache import post_card_tags, tag_versions
+from .models import Post
+from .visibility import publish_if_due
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def viewer(request):
+    if request.user.is_authenticated:
+        # В формах страницы — CSRF-токен, а он меняется при каждом входе;
+        # без него после повторного входа браузер получил бы 304 и
+        # отправил бы форму со старым токеном.
+        return ':'.join([
+            str(request.user.pk),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+            request.session.session_key or '',
+        ])
+    return 'anon'
+
+
+def feed_etag(request, *args, **kwargs):
+    # Наступившая отложенная публикация тоже меняет версию тега feed.
+    publish_if_due()
+    return make_etag(viewer(request), *tag_versions(['feed', 'users']))
+
+
+def post_etag(request, pk):
+    publish_if_due()
+    row = (Post.objects.filter(pk=pk)
+           .values('category_id', 'location_id', 'author_id', 'is_visible')
+           .annotate(last_comment=Max('comments__created_at'))
+           .first())
+    if row is None:
+        return None
+    post = Post(pk=pk, category_id=row['category_id'],
+                location_id=row['location_id'], author_id=row['author_id'])
+    return make_etag(viewer(request), row['is_visible'],
+                     row['last_comment'],
+                     *tag_versions(post_card_tags(post) + ['users']))
+
+
+feed_condition = condition(etag_func=feed_etag)
+post_condition = condition(etag_func=post_etag)
@@ -0,0 +1,40 @@
+"""Число постов в списках с постраничной навигацией.
+
+``Paginator.count`` делает ``COUNT(*)`` с полным условием публикации на
+каждый запрос страницы. Здесь число хранится в кэше под версией тега
+``COUNT_TAG``, который сбрасывают сигналы при изменении постов и
+категорий и ``publish_due_posts``.
+
+Для больших списков точное число не так важно, а пересчитывать его после
+каждой новой публикации дорого. Если последний подсчёт дал не меньше
+``COUNT_ESTIMATE_THRESHOLD``, то до истечения
+``COUNT_ESTIMATE_TIMEOUT`` используется он — даже если тег уже сброшен.
+Страниц в навигации тогда может оказаться на одну больше или меньше.
+"""
+from django.conf import settings
+
+from .cache import get_cache, versioned_key
+
+COUNT_TAG = 'post_counts'
+
+
+def _estimate_key(name):
+    return f'blog:count-estimate:{name}'
+
+
+def listing_count(name, queryset):
+    """Число строк ``queryset``; ``name`` различает списки в кэше."""
+    cache = get_cache()
+    key = versioned_key('count', [COUNT_TAG], name)
+    count = cache.get(key)
+    if count is not None:
+        return count
+    count = cache.get(_estimate_key(name))
+    if count is not None:
+        return count
+    count = queryset.count()
+    cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+    if count >= settings.COUNT_ESTIMATE_THRESHOLD:
+        cache.set(_estimate_key(name), count,
+                  settings.COUNT_ESTIMATE_TIMEOUT)
+    return count
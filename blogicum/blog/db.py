@@ -0,0 +1,47 @@
+"""Настройка соединений с SQLite и массовая вставка строк."""
+import itertools
+
+from django.conf import settings
+from django.db import connection
+
+
+def pragma_statements(pragmas):
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def apply_pragmas(cursor, pragmas):
+    for statement in pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS для каждого нового соединения."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, getattr(settings, 'SQLITE_PRAGMAS', {}))
+
+
+def insert_rows(model, columns, rows, batch_size=1000):
+    """Вставляет строки пачками через executemany, без создания объектов.
+
+    ``columns`` — имена полей модели, значения в ``rows`` уже в том виде,
+    в каком их принимает БД. Сигналы не отправляются. Возвращает число
+    вставленных строк.
+    """
+    fields = [model._meta.get_field(name) for name in columns]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    rows = iter(rows)
+    total = 0
+    with connection.cursor() as cursor:
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return total
+            cursor.executemany(sql, batch)
+            total += len(batch)
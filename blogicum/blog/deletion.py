@@ -0,0 +1,104 @@
+"""Быстрое удаление постов и пользователей.
+
+``Model.delete()`` сначала загружает все связанные комментарии, чтобы
+отправить для каждого сигналы, и только потом удаляет. Здесь комментарии
+удаляются прямыми ``DELETE`` пачками по DELETE_CHUNK_SIZE строк, каждая
+в своей короткой транзакции, а то, что делали бы сигналы (лента,
+поисковый индекс, кэш, счётчики), делается явно. Файлы изображений
+удаляет фоновая задача delete_post_images.
+"""
+from collections import Counter
+
+from django.db import connection, transaction
+
+from . import search
+from .cache import invalidate_on_commit
+from .counts import COUNT_TAG
+from .feed import adjust_comment_count
+from .jobs import enqueue
+from .models import Comment, FeedEntry, Post
+from .visibility import reset_next_publication
+
+DELETE_CHUNK_SIZE = 1000
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _delete_in_chunks(model, column, values, chunk_size):
+    """Удаляет строки ``model``, где ``column`` из ``values``, пачками."""
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    pk = quote(model._meta.pk.column)
+    column = quote(column)
+    total = 0
+    for chunk in _chunks(values, chunk_size):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE {pk} IN ('
+                    f'SELECT {pk} FROM {table} WHERE {column} IN '
+                    f'({placeholders}) LIMIT %s)',
+                    [*chunk, chunk_size])
+                deleted = cursor.rowcount
+            total += deleted
+            if deleted < chunk_size:
+                break
+    return total
+
+
+def delete_posts(post_ids, chunk_size=DELETE_CHUNK_SIZE):
+    """Удаляет посты с комментариями; возвращает число удалённых постов."""
+    posts = list(Post.objects.filter(pk__in=list(post_ids))
+                 .values_list('pk', 'image'))
+    if not posts:
+        return 0
+    post_ids = [pk for pk, _ in posts]
+    _delete_in_chunks(Comment, 'post_id', post_ids, chunk_size)
+    with transaction.atomic():
+        # Ещё раз: комментарии могли добавить, пока шло удаление.
+        _delete_in_chunks(Comment, 'post_id', post_ids, chunk_size)
+        _delete_in_chunks(FeedEntry, 'post_id', post_ids, chunk_size)
+        search.unindex_posts(post_ids)
+        deleted = _delete_in_chunks(Post, 'id', post_ids, chunk_size)
+        invalidate_on_commit('feed', COUNT_TAG,
+                             *(f'post:{pk}' for pk in post_ids))
+        images = sorted({image for _, image in posts if image})
+        if images:
+            transaction.on_commit(
+                lambda: enqueue('delete_post_images', names=images))
+    reset_next_publication()
+    return deleted
+
+
+def _delete_user_comments(user, chunk_size):
+    """Удаляет комментарии пользователя к чужим постам пачками.
+
+    Пачка и уменьшение счётчиков её постов — одна транзакция, поэтому
+    счётчики не расходятся с комментариями, даже если удаление прервётся.
+    """
+    while True:
+        with transaction.atomic():
+            rows = list(Comment.objects.filter(author=user).order_by()
+                        .values_list('pk', 'post_id')[:chunk_size])
+            if not rows:
+                return
+            _delete_in_chunks(Comment, 'id', [pk for pk, _ in rows],
+                              chunk_size)
+            counts = Counter(post_id for _, post_id in rows)
+            for post_id, total in counts.items():
+                adjust_comment_count(post_id, -total)
+            invalidate_on_commit(*(f'post:{pk}' for pk in counts))
+
+
+def delete_user(user, chunk_size=DELETE_CHUNK_SIZE):
+    """Удаляет пользователя, его посты и комментарии."""
+    delete_posts(Post.objects.filter(author=user)
+                 .values_list('pk', flat=True), chunk_size)
+    _delete_user_comments(user, chunk_size)
+    # Оставшиеся связи (группы, журнал админки) удаляет Django.
+    user.delete()
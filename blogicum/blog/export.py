@@ -0,0 +1,108 @@
+"""Потоковая выгрузка постов и комментариев в NDJSON и CSV.
+
+Строки читаются из БД через ``iterator(chunk_size=...)`` и сразу
+превращаются в текст, поэтому память не зависит от объёма выгрузки.
+"""
+import csv
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Выгружаемые поля и поле даты, по которому фильтрует since/until.
+EXPORTS = {
+    'posts': (Post, 'pub_date', (
+        'id', 'title', 'text', 'pub_date', 'author__username',
+        'category__slug', 'location__name', 'is_published', 'is_visible',
+        'image', 'comment_count',
+    )),
+    'comments': (Comment, 'created_at', (
+        'id', 'post_id', 'author__username', 'text', 'created_at',
+    )),
+}
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_moment(value, end=False):
+    """Дата или дата и время из строки; дата без времени — весь день."""
+    try:
+        moment = parse_datetime(value)
+        day = None if moment else parse_date(value)
+    except ValueError:
+        # Формат верный, но такой даты нет: 2024-02-30, 25:00.
+        raise ExportError(f'Неверная дата: {value!r}')
+    if moment is None:
+        if day is None:
+            raise ExportError(f'Неверная дата: {value!r}')
+        moment = datetime.combine(day, time.max if end else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(kind, author=None, category=None, since=None, until=None,
+                chunk_size=EXPORT_CHUNK_SIZE):
+    """Имена полей и итератор кортежей значений для выгрузки ``kind``."""
+    if kind not in EXPORTS:
+        raise ExportError(f'Неизвестная выгрузка: {kind!r}')
+    model, date_field, fields = EXPORTS[kind]
+    queryset = model.objects.order_by('pk')
+    if author:
+        queryset = queryset.filter(author__username=author)
+    if category:
+        queryset = queryset.filter(
+            **{'category__slug' if model is Post else 'post__category__slug':
+               category})
+    if since:
+        queryset = queryset.filter(
+            **{f'{date_field}__gte': parse_moment(since)})
+    if until:
+        queryset = queryset.filter(
+            **{f'{date_field}__lte': parse_moment(until, end=True)})
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    return fields, rows
+
+
+def ndjson_lines(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+class _Line:
+    """Файл для csv.writer, который просто возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(fields, rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        ])
+
+
+def export_lines(kind, export_format, **options):
+    """Строки выгрузки; неверные параметры вызывают ExportError сразу."""
+    if export_format not in FORMATS:
+        raise ExportError(f'Неизвестный формат: {export_format!r}')
+    fields, rows = export_rows(kind, **options)
+    if export_format == 'csv':
+        return csv_lines(fields, rows)
+    return ndjson_lines(fields, rows)
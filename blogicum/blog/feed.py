@@ -0,0 +1,111 @@
+"""Поддержка таблицы FeedEntry в актуальном состоянии."""
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils.text import Truncator
+
+from .cache import invalidate_on_commit
+from .db import insert_rows
+from .models import FeedEntry, Post
+
+FEED_PREVIEW_WORDS = 10
+
+
+def entry_for(post):
+    location = post.location
+    return FeedEntry(
+        post_id=post.pk,
+        title=post.title,
+        text_preview=Truncator(post.text).words(FEED_PREVIEW_WORDS),
+        pub_date=post.pub_date,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        category_id=post.category_id,
+        category_slug=post.category.slug,
+        category_title=post.category.title,
+        location_id=post.location_id,
+        location_name=(location.name
+                       if location and location.is_published else ''),
+        image=post.image.name if post.image else '',
+        comment_count=post.comment_count,
+    )
+
+
+def sync_posts(post_ids):
+    """Пересобирает записи ленты для указанных постов."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    posts = (Post.objects.filter(pk__in=post_ids)
+             .select_related('author', 'category', 'location'))
+    entries = [entry_for(post) for post in posts if post.is_public]
+    with transaction.atomic():
+        FeedEntry.objects.filter(pk__in=post_ids).delete()
+        FeedEntry.objects.bulk_create(entries)
+
+
+def sync_category(category):
+    if not category.is_published:
+        FeedEntry.objects.filter(category_id=category.pk).delete()
+        return
+    FeedEntry.objects.filter(category_id=category.pk).update(
+        category_slug=category.slug, category_title=category.title)
+    sync_posts(Post.objects.filter(
+        category=category, is_visible=True, feed_entry__isnull=True
+    ).values_list('pk', flat=True))
+
+
+def sync_location(location):
+    FeedEntry.objects.filter(location_id=location.pk).update(
+        location_name=location.name if location.is_published else '')
+
+
+def sync_author(user):
+    FeedEntry.objects.filter(author_id=user.pk).update(
+        author_username=user.username)
+
+
+def adjust_comment_count(post_id, delta):
+    """Меняет счётчик комментариев поста и его записи в ленте.
+
+    Счётчик не опускается ниже нуля, даже если он уже расходится с
+    числом комментариев (его исправит ``recount_comments``).
+    """
+    count = Greatest(F('comment_count') + delta, 0)
+    with transaction.atomic():
+        Post.objects.filter(pk=post_id).update(comment_count=count)
+        FeedEntry.objects.filter(pk=post_id).update(comment_count=count)
+
+
+def rebuild(batch_size=1000):
+    """Полностью пересобирает ленту, возвращает число записей.
+
+    Посты читаются кортежами, а записи вставляются executemany: создание
+    моделей для каждой строки заняло бы большую часть времени. Версия тега
+    ``feed`` меняется, чтобы ETag и кэш страниц ленты стали недействительны.
+    """
+    adapt = connection.ops.adapt_datetimefield_value
+    posts = Post.objects.published().values_list(
+        'pk', 'title', 'text', 'pub_date', 'author_id', 'author__username',
+        'category_id', 'category__slug', 'category__title', 'location_id',
+        'location__name', 'location__is_published', 'image', 'comment_count',
+    ).iterator(chunk_size=batch_size)
+    rows = (
+        (pk, title, Truncator(text).words(FEED_PREVIEW_WORDS),
+         adapt(pub_date), author_id, username, category_id, slug,
+         category_title, location_id,
+         location_name if location_published else '', image,
+         comment_count)
+        for (pk, title, text, pub_date, author_id, username, category_id,
+             slug, category_title, location_id, location_name,
+             location_published, image, comment_count) in posts
+    )
+    with transaction.atomic():
+        FeedEntry.objects.all().delete()
+        invalidate_on_commit('feed')
+        return insert_rows(FeedEntry, [
+            'post', 'title', 'text_preview', 'pub_date', 'author_id',
+            'author_username', 'category_id', 'category_slug',
+            'category_title', 'location_id', 'location_name', 'image',
+            'comment_count',
+        ], rows, batch_size)
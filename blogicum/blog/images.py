@@ -0,0 +1,112 @@
+"""Уменьшенные копии изображений постов для srcset.
+
+Для каждой ширины из IMAGE_VARIANT_WIDTHS, меньшей ширины оригинала,
+рядом с ним сохраняются WebP и JPEG:
+``posts/variants/<имя файла>_<ширина>.<ext>``. Для изображений уже самой
+узкой копии вместо копий сохраняется пустой файл-отметка, чтобы их не
+обрабатывать снова.
+"""
+import hashlib
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .cache import get_cache
+
+IMAGE_VARIANT_WIDTHS = (320, 640, 960)
+IMAGE_VARIANT_FORMATS = (
+    ('webp', 'WEBP'),
+    ('jpg', 'JPEG'),
+)
+IMAGE_VARIANT_QUALITY = 80
+
+
+def variant_name(name, width, ext):
+    # Имя оригинала целиком, с расширением: у a.jpg и a.png копии разные.
+    dirname, filename = posixpath.split(name)
+    return posixpath.join(dirname, 'variants', f'{filename}_{width}.{ext}')
+
+
+def variant_names(name):
+    return [variant_name(name, width, ext)
+            for width in IMAGE_VARIANT_WIDTHS
+            for ext, _ in IMAGE_VARIANT_FORMATS]
+
+
+def no_variants_marker(name):
+    dirname, filename = posixpath.split(name)
+    return posixpath.join(dirname, 'variants', f'{filename}.none')
+
+
+def has_variants(name, storage=default_storage):
+    """Обработано ли изображение: копии создаются начиная с самой узкой."""
+    return (storage.exists(variant_names(name)[0])
+            or storage.exists(no_variants_marker(name)))
+
+
+def generate_variants(name, storage=default_storage):
+    """Создаёт уменьшенные копии изображения, возвращает их имена."""
+    with storage.open(name) as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    created = []
+    for width in IMAGE_VARIANT_WIDTHS:
+        if width >= image.width:
+            break
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for ext, image_format in IMAGE_VARIANT_FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, image_format,
+                         quality=IMAGE_VARIANT_QUALITY, optimize=True)
+            target = variant_name(name, width, ext)
+            if storage.exists(target):
+                storage.delete(target)
+            created.append(storage.save(target, ContentFile(
+                buffer.getvalue())))
+    if not created and not storage.exists(no_variants_marker(name)):
+        storage.save(no_variants_marker(name), ContentFile(b''))
+    forget_srcsets(name)
+    return created
+
+
+def _srcsets_key(name):
+    return f'blog:srcsets:{hashlib.md5(name.encode()).hexdigest()}'
+
+
+def forget_srcsets(name):
+    get_cache().delete(_srcsets_key(name))
+
+
+def image_srcsets(name, storage=default_storage):
+    """Атрибуты srcset по форматам: {'webp': '... 320w'}.
+
+    Какие копии уже созданы, проверяется в хранилище один раз, дальше
+    результат берётся из кэша; generate_variants его сбрасывает.
+    """
+    cache = get_cache()
+    key = _srcsets_key(name)
+    srcsets = cache.get(key)
+    if srcsets is None:
+        srcsets = _find_srcsets(name, storage)
+        cache.set(key, srcsets, settings.POST_CARD_CACHE_TIMEOUT)
+    return srcsets
+
+
+def _find_srcsets(name, storage):
+    srcsets = {}
+    for ext, _ in IMAGE_VARIANT_FORMATS:
+        candidates = []
+        for width in IMAGE_VARIANT_WIDTHS:
+            target = variant_name(name, width, ext)
+            if not storage.exists(target):
+                break
+            candidates.append(f'{storage.url(target)} {width}w')
+        if candidates:
+            srcsets[ext] = ', '.join(candidates)
+    return srcsets
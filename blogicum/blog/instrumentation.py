@@ -0,0 +1,143 @@
+"""Замеры времени обработки запроса и заголовок Server-Timing.
+
+Middleware собирает за запрос число и время SQL-запросов, время
+рендеринга шаблонов, попадания и промахи кэша и общее время, отдаёт их
+в заголовке Server-Timing и пишет строкой JSON в лог ``blog.performance``.
+Запросы замеряются выборочно (SERVER_TIMING_SAMPLE_RATE).
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import (DjangoTemplates, Template,
+                                             reraise)
+from django.template.exceptions import TemplateDoesNotExist
+
+logger = logging.getLogger('blog.performance')
+
+_current = ContextVar('blog_request_stats', default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+def record_cache(hit):
+    stats = _current.get()
+    if stats is None:
+        return
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+@contextmanager
+def timed_template():
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    # Вложенный рендеринг (карточки внутри страницы) уже учтён внешним.
+    stats.template_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.template_depth -= 1
+        if not stats.template_depth:
+            stats.template_time += time.perf_counter() - start
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed_template():
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(stats.record_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={_ms(stats.db_time)};desc="{stats.queries} queries"',
+                f'tpl;dur={_ms(stats.template_time)}',
+                f'cache;desc="hit={stats.cache_hits} '
+                f'miss={stats.cache_misses}"',
+                f'total;dur={_ms(total)}',
+            ])
+        self.log(request, response, stats, total)
+        return response
+
+    def log(self, request, response, stats, total):
+        over_budget = (
+            stats.queries > settings.SERVER_TIMING_QUERY_BUDGET
+            or _ms(total) > settings.SERVER_TIMING_TIME_BUDGET_MS
+        )
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': stats.queries,
+            'db_ms': _ms(stats.db_time),
+            'template_ms': _ms(stats.template_time),
+            'cache_hits': stats.cache_hits,
+            'cache_misses': stats.cache_misses,
+            'total_ms': _ms(total),
+            'over_budget': over_budget,
+        }
+        logger.log(logging.WARNING if over_budget else logging.INFO,
+                   json.dumps(record, ensure_ascii=False))
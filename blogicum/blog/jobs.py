@@ -0,0 +1,134 @@
+"""Фоновые задачи в таблице Job.
+
+Задача — функция, зарегистрированная декоратором ``task``; ``enqueue``
+сохраняет вызов в таблицу, а команда ``runworker`` забирает и выполняет
+задачи. Без BACKGROUND_JOBS задача выполняется сразу, в том же запросе.
+
+Обработчик забирает задачу условным UPDATE: строка меняется, только если
+она всё ещё свободна, поэтому одну задачу не возьмут два обработчика даже
+без блокировок строк, которых в SQLite нет. Взятая задача арендуется на
+JOB_LEASE секунд; если обработчик за это время не отчитался (например,
+упал), задачу заберёт другой.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(name):
+    """Регистрирует функцию как задачу с именем ``name``."""
+    def register(function):
+        TASKS[name] = function
+        return function
+    return register
+
+
+def enqueue(name, /, *, delay=0, max_attempts=None, **payload):
+    """Ставит задачу в очередь; аргументы должны сериализоваться в JSON.
+
+    Возвращает Job или None, если задача выполнена сразу.
+    """
+    if name not in TASKS:
+        raise KeyError(f'Неизвестная задача: {name!r}')
+    if not settings.BACKGROUND_JOBS:
+        TASKS[name](**payload)
+        return None
+    return Job.objects.create(
+        name=name, payload=payload,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim(worker, limit, lease=None):
+    """Забирает до ``limit`` готовых задач для обработчика ``worker``."""
+    now = timezone.now()
+    lease = settings.JOB_LEASE if lease is None else lease
+    # Попытки задач, чей обработчик пропал, тоже считаются.
+    Job.objects.filter(
+        status=Job.RUNNING, locked_until__lt=now,
+        attempts__gte=F('max_attempts'),
+    ).update(status=Job.FAILED, finished_at=now, locked_until=None,
+             last_error='Обработчик не завершил последнюю попытку.')
+    ready = (Q(status=Job.QUEUED, run_after__lte=now)
+             | Q(status=Job.RUNNING, locked_until__lt=now))
+    candidates = list(Job.objects.filter(ready)
+                      .order_by('run_after', 'pk')
+                      .values_list('pk', flat=True)[:limit])
+    claimed = [
+        pk for pk in candidates
+        if Job.objects.filter(ready, pk=pk).update(
+            status=Job.RUNNING, locked_by=worker,
+            locked_until=now + timedelta(seconds=lease),
+            attempts=F('attempts') + 1)
+    ]
+    return list(Job.objects.filter(pk__in=claimed)
+                .order_by('run_after', 'pk'))
+
+
+def retry_delay(attempts):
+    return settings.JOB_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def run(job, worker):
+    """Выполняет взятую задачу и записывает итог.
+
+    Возвращает 'done', 'retry', 'failed' или 'lost' — если аренду за это
+    время забрал другой обработчик и итог не записан.
+    """
+    close_old_connections()
+    try:
+        TASKS[job.name](**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Задача %s не выполнена:\n%s', job, error)
+        now = timezone.now()
+        if job.attempts >= job.max_attempts:
+            outcome, changes = 'failed', {'status': Job.FAILED,
+                                          'finished_at': now}
+        else:
+            outcome, changes = 'retry', {
+                'status': Job.QUEUED,
+                'run_after': now + timedelta(
+                    seconds=retry_delay(job.attempts)),
+            }
+        changes['last_error'] = error
+    else:
+        outcome, changes = 'done', {'status': Job.DONE,
+                                    'finished_at': timezone.now()}
+    updated = Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, locked_by=worker,
+        attempts=job.attempts,
+    ).update(locked_until=None, **changes)
+    close_old_connections()
+    return outcome if updated else 'lost'
+
+
+def purge(older_than=None):
+    """Удаляет выполненные задачи старше ``older_than`` секунд."""
+    older_than = (settings.JOB_RETENTION if older_than is None
+                  else older_than)
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE,
+        finished_at__lt=timezone.now() - timedelta(seconds=older_than),
+    ).delete()
+    return deleted
+
+
+def queue_stats():
+    """Число задач по состояниям."""
+    counts = dict.fromkeys((status for status, _ in Job.STATUSES), 0)
+    for row in Job.objects.values('status').annotate(total=Count('pk')):
+        counts[row['status']] = row['total']
+    return counts
@@ -0,0 +1,26 @@
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .jobs import enqueue
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Отдаёт письма фоновой задаче send_email вместо отправки в запросе.
+
+    Вложения не поддерживаются: письма блога (сброс пароля) их не имеют.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            enqueue(
+                'send_email',
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email,
+                to=message.to,
+                cc=message.cc,
+                bcc=message.bcc,
+                reply_to=message.reply_to,
+                headers=message.extra_headers,
+                alternatives=getattr(message, 'alternatives', []),
+            )
+        return len(email_messages)
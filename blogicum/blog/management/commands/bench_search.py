@@ -0,0 +1,103 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Category, Post
+from blog.search import fts_enabled, index_posts, search_paginator
+
+SYLLABLES = ('ка', 'ро', 'ми', 'ло', 'на', 'те', 'ви', 'ду', 'за', 'по',
+             'ре', 'си', 'ку', 'мо', 'ла', 'ны')
+
+
+class Rollback(Exception):
+    pass
+
+
+def vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES)
+                          for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает поиск через FTS5 и через icontains на '
+            'сгенерированном корпусе. Все созданные данные откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--words', type=int, default=40,
+                            help='Слов в тексте поста.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, posts, words, repeat, seed, **options):
+        if not fts_enabled():
+            raise CommandError('Таблица FTS5 недоступна: примените миграции '
+                               'на SQLite с поддержкой FTS5.')
+        rng = random.Random(seed)
+        vocab = vocabulary(5000, rng)
+        # Частоты слов по закону Ципфа: первые слова встречаются почти
+        # везде, последние — в единицах постов.
+        weights = [1 / rank for rank in range(1, len(vocab) + 1)]
+        queries = {
+            'частое слово': vocab[0],
+            'среднее слово': vocab[200],
+            'редкое слово': vocab[-1],
+            'два слова': f'{vocab[1]} {vocab[50]}',
+        }
+        try:
+            with transaction.atomic():
+                self.generate(posts, words, vocab, weights, rng)
+                for name, query in queries.items():
+                    fts = self.measure(query, True, repeat)
+                    like = self.measure(query, False, repeat)
+                    self.stdout.write(
+                        f'{name} ({query!r}): FTS5 {fts:.1f} мс, '
+                        f'icontains {like:.1f} мс')
+                raise Rollback
+        except Rollback:
+            pass
+
+    def generate(self, count, words, vocab, weights, rng):
+        author = get_user_model().objects.create(username='bench-search')
+        category = Category.objects.create(
+            title='Бенчмарк', slug='bench-search', description='-')
+        now = timezone.now()
+        start = time.perf_counter()
+        batch_size = 5000
+        for offset in range(0, count, batch_size):
+            last_id = Post.objects.order_by('-pk').values_list(
+                'pk', flat=True).first() or 0
+            Post.objects.bulk_create(
+                Post(
+                    title=' '.join(rng.choices(vocab, weights, k=4)),
+                    text=' '.join(rng.choices(vocab, weights, k=words)),
+                    pub_date=now - timezone.timedelta(minutes=offset + n),
+                    author=author,
+                    category=category,
+                    is_published=True,
+                    is_visible=True,
+                )
+                for n in range(min(batch_size, count - offset))
+            )
+            # На SQLite bulk_create не возвращает id созданных объектов,
+            # а rowid в индексе должен совпадать с id поста.
+            index_posts(Post.objects.filter(pk__gt=last_id)
+                        .only('title', 'text'))
+        self.stdout.write(f'Создано постов: {count} за '
+                          f'{time.perf_counter() - start:.1f} с')
+
+    def measure(self, query, fts, repeat):
+        """Медиана времени первой страницы выдачи, мс."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(search_paginator(query, fts=fts).page())
+            timings.append((time.perf_counter() - start) * 1000)
+        return sorted(timings)[len(timings) // 2]
@@ -0,0 +1,129 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.db import apply_pragmas
+
+SCHEMA = [
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, title TEXT, text TEXT, '
+    'pub_date TEXT, comment_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE INDEX post_date_idx ON post (pub_date DESC, id DESC)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'text TEXT, created_at TEXT)',
+    'CREATE INDEX comment_post_idx ON comment (post_id, created_at)',
+]
+
+FEED_SQL = ('SELECT id, title, substr(text, 1, 500), comment_count FROM post '
+            'ORDER BY pub_date DESC, id DESC LIMIT 10')
+
+
+def create_database(path, posts):
+    db = sqlite3.connect(path)
+    for statement in SCHEMA:
+        db.execute(statement)
+    db.executemany(
+        'INSERT INTO post (title, text, pub_date) VALUES (?, ?, ?)',
+        ((f'Пост {n}', 'текст ' * 200, f'2024-01-01 00:00:{n % 60:02}')
+         for n in range(posts)))
+    db.commit()
+    db.close()
+
+
+def connect(path, pragmas):
+    # isolation_level=None: транзакциями управляет сам бенчмарк.
+    db = sqlite3.connect(path, timeout=5, isolation_level=None,
+                         check_same_thread=False)
+    apply_pragmas(db, pragmas)
+    return db
+
+
+def reader(path, pragmas, deadline, result):
+    db = connect(path, pragmas)
+    counts = {'reads': 0, 'errors': 0}
+    while time.perf_counter() < deadline:
+        try:
+            db.execute(FEED_SQL).fetchall()
+            counts['reads'] += 1
+        except sqlite3.OperationalError:
+            counts['errors'] += 1
+    db.close()
+    result.append(counts)
+
+
+def writer(path, pragmas, deadline, posts, result):
+    db = connect(path, pragmas)
+    counts = {'writes': 0, 'errors': 0}
+    n = 0
+    while time.perf_counter() < deadline:
+        post_id = n % posts + 1
+        n += 1
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute(
+                'INSERT INTO comment (post_id, text, created_at) '
+                "VALUES (?, 'комментарий', datetime('now'))", (post_id,))
+            db.execute('UPDATE post SET comment_count = comment_count + 1 '
+                       'WHERE id = ?', (post_id,))
+            db.execute('COMMIT')
+            counts['writes'] += 1
+        except sqlite3.OperationalError:
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            counts['errors'] += 1
+    db.close()
+    result.append(counts)
+
+
+def run(path, pragmas, readers, writers, duration, posts):
+    # Каждый поток добавляет в список свои счётчики.
+    result = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=reader, args=(path, pragmas, deadline, result))
+        for _ in range(readers)
+    ] + [
+        threading.Thread(target=writer,
+                         args=(path, pragmas, deadline, posts, result))
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {key: sum(counts.get(key, 0) for counts in result)
+            for key in ('reads', 'writes', 'errors')}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность SQLite при одновременном '
+            'чтении ленты и записи комментариев: настройки по умолчанию '
+            'против SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5,
+                            help='Длительность каждого прогона, секунд.')
+        parser.add_argument('--posts', type=int, default=1000)
+
+    def handle(self, *args, readers, writers, duration, posts, **options):
+        profiles = {
+            'по умолчанию': {},
+            'SQLITE_PRAGMAS': settings.SQLITE_PRAGMAS,
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            for number, (name, pragmas) in enumerate(profiles.items()):
+                # Режим WAL сохраняется в файле БД, поэтому у каждого
+                # прогона своя база.
+                path = str(Path(tmp) / f'bench{number}.sqlite3')
+                create_database(path, posts)
+                result = run(path, pragmas, readers, writers, duration, posts)
+                self.stdout.write(
+                    f'{name}: чтений/с {result["reads"] / duration:.0f}, '
+                    f'записей/с {result["writes"] / duration:.0f}, '
+                    f'ошибок блокировки {result["errors"]}')
@@ -0,0 +1,268 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+
+User = get_user_model()
+
+PASSWORD = 'bench-password'
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True, cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Dataset:
+    """Объекты, на которые ссылаются сценарии, для одного размера данных."""
+
+    def __init__(self, count):
+        self.user = User.objects.create_user('bench', password=PASSWORD)
+        self.category = (
+            Category.objects.filter(is_published=True)
+            .annotate(posts=Count('post', filter=Q(post__is_visible=True)))
+            .order_by('-posts').first()
+        )
+        visible = Post.objects.published()
+        self.busy_post = visible.order_by('-comment_count').first()
+        self.author = (User.objects.annotate(total=Count('post'))
+                       .order_by('-total').first())
+        self.own_post = self.create_post('Пост бенчмарка')
+        self.comment = Comment.objects.create(
+            post=self.busy_post, author=self.user, text='Комментарий')
+        # Удаляемые объекты создаются заранее, по одному на запрос.
+        self.doomed_posts = [self.create_post(f'Удаляемый пост {n}')
+                             for n in range(count)]
+        self.doomed_comments = [
+            Comment.objects.create(post=self.busy_post, author=self.user,
+                                   text=f'Удаляемый комментарий {n}')
+            for n in range(count)
+        ]
+
+    def create_post(self, title):
+        return Post.objects.create(
+            title=title, text='Текст поста бенчмарка.', author=self.user,
+            category=self.category, pub_date=timezone.now(),
+            is_published=True)
+
+    def post_form(self, n):
+        return {
+            'title': f'Пост бенчмарка {n}',
+            'text': 'Изменённый текст поста бенчмарка.',
+            'pub_date': timezone.localtime(
+                self.own_post.pub_date).strftime('%Y-%m-%d %H:%M:%S'),
+            'category': self.category.pk,
+            'is_published': 'on',
+        }
+
+
+def scenarios(data):
+    """Сценарий: (имя, авторизован ли клиент, ожидаемый статус, запрос).
+
+    Запрос — функция от номера итерации, возвращающая (метод, URL, данные).
+    """
+    return [
+        ('index', False, 200, lambda n: ('get', '/', None)),
+        ('index (авторизован)', True, 200, lambda n: ('get', '/', None)),
+        ('category_posts', False, 200, lambda n: (
+            'get', f'/category/{data.category.slug}/', None)),
+        ('post_detail', False, 200, lambda n: (
+            'get', f'/posts/{data.busy_post.pk}/', None)),
+        ('profile', False, 200, lambda n: (
+            'get', f'/profile/{data.author.username}/', None)),
+        ('add_comment', True, 302, lambda n: (
+            'post', f'/posts/{data.busy_post.pk}/comment/',
+            {'text': f'Новый комментарий {n}'})),
+        ('edit_post', True, 302, lambda n: (
+            'post', f'/posts/{data.own_post.pk}/edit/', data.post_form(n))),
+        ('edit_comment', True, 302, lambda n: (
+            'post',
+            f'/posts/{data.busy_post.pk}/edit_comment/{data.comment.pk}/',
+            {'text': f'Изменённый комментарий {n}'})),
+        ('delete_comment', True, 302, lambda n: (
+            'post',
+            f'/posts/{data.busy_post.pk}/delete_comment/'
+            f'{data.doomed_comments[n].pk}/', {})),
+        ('delete_post', True, 302, lambda n: (
+            'post', f'/posts/{data.doomed_posts[n].pk}/delete/', {})),
+    ]
+
+
+def measure(client, request, expected, requests, warmup):
+    timings, queries, statuses = [], [], {}
+    for n in range(warmup + requests):
+        method, url, payload = request(n)
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, payload)
+            elapsed = time.perf_counter() - start
+        if n < warmup:
+            continue
+        statuses[response.status_code] = (
+            statuses.get(response.status_code, 0) + 1)
+        timings.append(elapsed * 1000)
+        queries.append(len(captured))
+    # Пик памяти снимается отдельным запросом: tracemalloc сильно
+    # замедляет выполнение и исказил бы задержки. Изменяющие запросы
+    # повторить нельзя, для них пик не снимается.
+    method, url, payload = request(0)
+    if method == 'get':
+        tracemalloc.start()
+        getattr(client, method)(url, payload)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory_peak = round(peak / 1024, 1)
+    else:
+        memory_peak = None
+    return {
+        'requests': len(timings),
+        'statuses': {str(code): count for code, count in statuses.items()},
+        'unexpected_status': any(code != expected for code in statuses),
+        'latency_ms': {
+            'mean': round(statistics.mean(timings), 2),
+            'p50': round(percentile(timings, 0.5), 2),
+            'p90': round(percentile(timings, 0.9), 2),
+            'p99': round(percentile(timings, 0.99), 2),
+            'max': round(max(timings), 2),
+        },
+        'queries': {
+            'median': statistics.median(queries),
+            'max': max(queries),
+        },
+        'memory_peak_kb': memory_peak,
+    }
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет основные страницы и действия блога через тестовый '
+            'клиент на сгенерированных данных нескольких размеров и пишет '
+            'отчёт JSON: задержки, число SQL-запросов, пик памяти. Данные '
+            'создаются во временной БД, рабочая БД не затрагивается.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000',
+            help='Число постов в наборах данных, через запятую. '
+                 'Комментариев в 10 раз больше, пользователей в 100 раз '
+                 'меньше.')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Запросов на сценарий.')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', default='bench_views.json',
+                            help='Файл отчёта; «-» — вывести в stdout.')
+
+    def handle(self, *args, sizes, requests, warmup, seed, output,
+               **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Бенчмарк рассчитан на SQLite.')
+        try:
+            sizes = [int(size) for size in sizes.split(',')]
+        except ValueError:
+            raise CommandError('--sizes: ожидаются числа через запятую.')
+        report = {
+            'created': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'settings': {
+                'profile': getattr(settings, 'SETTINGS_PROFILE', None),
+                'debug': settings.DEBUG,
+                'cache_backend': settings.CACHES['default']['BACKEND'],
+                'anonymous_page_cache': settings.ANONYMOUS_PAGE_CACHE,
+                'sqlite_pragmas': settings.SQLITE_PRAGMAS,
+            },
+            'requests': requests,
+            'sizes': {},
+        }
+        for size in sizes:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Постов: {size}'))
+            report['sizes'][str(size)] = self.run_size(
+                size, requests, warmup, seed)
+        text = json.dumps(report, ensure_ascii=False, indent=2,
+                          sort_keys=True)
+        if output == '-':
+            self.stdout.write(text)
+        else:
+            with open(output, 'w', encoding='utf-8') as report_file:
+                report_file.write(text + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Отчёт: {output}'))
+
+    def run_size(self, size, requests, warmup, seed):
+        cache = settings.CACHES['default']
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            # Свой префикс ключей: записи бенчмарка не смешиваются
+            # с рабочим кэшем.
+            CACHES={'default': {**cache,
+                                'KEY_PREFIX': f'bench-{os.getpid()}-{size}'}},
+            ALLOWED_HOSTS=['testserver'],
+        ):
+            test_settings = connection.settings_dict.setdefault('TEST', {})
+            test_name = test_settings.get('NAME')
+            # Файл, а не БД в памяти: как и у рабочей БД.
+            test_settings['NAME'] = os.path.join(tmp, 'bench.sqlite3')
+            old_name = connection.creation.create_test_db(
+                verbosity=0, serialize=False)
+            try:
+                call_command(
+                    'generate_data', posts=size, comments=size * 10,
+                    users=max(size // 100, 10), images=0, seed=seed,
+                    stdout=StringIO())
+                result = {'dataset': {
+                    'users': User.objects.count(),
+                    'posts': Post.objects.count(),
+                    'comments': Comment.objects.count(),
+                }}
+                result['scenarios'] = self.run_scenarios(
+                    Dataset(warmup + requests), requests, warmup)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                test_settings['NAME'] = test_name
+        return result
+
+    def run_scenarios(self, data, requests, warmup):
+        anonymous, user = Client(), Client()
+        user.force_login(data.user)
+        results = {}
+        for name, authenticated, expected, request in scenarios(data):
+            client = user if authenticated else anonymous
+            result = measure(client, request, expected, requests, warmup)
+            results[name] = result
+            latency = result['latency_ms']
+            line = (f'{name}: p50 {latency["p50"]} мс, '
+                    f'p90 {latency["p90"]} мс, '
+                    f'запросов {result["queries"]["median"]}')
+            if result['unexpected_status']:
+                line = self.style.WARNING(
+                    f'{line}, статусы {result["statuses"]}')
+            self.stdout.write(line)
+        return results
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from blog.models import Category, Comment, FeedEntry, Post
+
+PAGE_SIZE = 10
+
+
+def feed_queries():
+    author = get_user_model().objects.order_by('pk').first()
+    category = Category.objects.order_by('pk').first()
+    post = Post.objects.order_by('pk').first()
+    author_id = author.pk if author else 0
+    return {
+        'index': FeedEntry.objects.order_by('-pub_date', '-pk'),
+        'следующая публикация': (Post.objects
+                                 .filter(is_published=True, is_visible=False)
+                                 .order_by('pub_date')),
+        'category_posts': (FeedEntry.objects
+                           .filter(category_id=category.pk if category else 0)
+                           .order_by('-pub_date', '-post')),
+        'profile (автор)': (Post.objects.feed()
+                            .filter(author_id=author_id)
+                            .order_by('-pub_date')),
+        'profile (гость)': (Post.objects.feed()
+                            .filter(author_id=author_id, is_visible=True)
+                            .order_by('-pub_date')),
+        'post_detail (комментарии)': (
+            Comment.objects.filter(post_id=post.pk if post else 0)
+            .order_by('created_at')),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Печатает план выполнения запросов, которые выполняют '
+            'страницы блога.')
+
+    def handle(self, *args, **options):
+        for name, queryset in feed_queries().items():
+            queryset = queryset[:PAGE_SIZE]
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            if options['verbosity'] > 1:
+                self.stdout.write(str(queryset.query))
+            # На SQLite explain() выполняет EXPLAIN QUERY PLAN.
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f'  {line}')
+            self.stdout.write('')
@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import (EXPORT_CHUNK_SIZE, EXPORTS, FORMATS, ExportError,
+                         export_lines)
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает посты или комментарии в NDJSON или CSV, '
+            'не загружая их в память целиком.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', dest='export_format',
+                            choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--category', help='Slug категории.')
+        parser.add_argument('--since', help='Не раньше даты (ГГГГ-ММ-ДД).')
+        parser.add_argument('--until', help='Не позже даты (ГГГГ-ММ-ДД).')
+        parser.add_argument('--chunk-size', type=int,
+                            default=EXPORT_CHUNK_SIZE)
+        parser.add_argument('--output', '-o',
+                            help='Файл; по умолчанию stdout.')
+
+    def handle(self, *args, kind, export_format, output, **options):
+        try:
+            lines = export_lines(
+                kind, export_format,
+                author=options['author'],
+                category=options['category'],
+                since=options['since'],
+                until=options['until'],
+                chunk_size=options['chunk_size'],
+            )
+        except ExportError as error:
+            raise CommandError(error)
+        if output:
+            # newline='': csv.writer сам пишет окончания строк.
+            with open(output, 'w', encoding='utf-8', newline='') as target:
+                target.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.comment_queue import flush
+
+
+class Command(BaseCommand):
+    help = ('Записывает в БД комментарии из журнала отложенной записи '
+            '(COMMENT_WRITE_BEHIND). С --loop работает постоянно.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять журнал каждые --interval '
+                 'секунд.')
+        parser.add_argument('--interval', type=float, default=1,
+                            help='Пауза между проверками, секунд.')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Комментариев в одной транзакции.')
+
+    def handle(self, *args, loop, interval, batch_size, **options):
+        while True:
+            written = flush(batch_size)
+            if written:
+                self.stdout.write(f'Записано комментариев: {written}')
+            if not loop:
+                return
+            time.sleep(interval)
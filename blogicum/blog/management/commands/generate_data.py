@@ -0,0 +1,274 @@
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image
+
+from blog import feed, search
+from blog.cache import invalidate
+from blog.counts import COUNT_TAG
+from blog.db import insert_rows
+from blog.models import Category, Comment, Location, Post
+from blog.visibility import reset_next_publication
+
+User = get_user_model()
+
+WORDS = (
+    'город', 'река', 'лес', 'дорога', 'утро', 'вечер', 'море', 'гора',
+    'день', 'ночь', 'друг', 'книга', 'работа', 'дом', 'окно', 'поезд',
+    'небо', 'солнце', 'дождь', 'снег', 'ветер', 'поле', 'сад', 'мост',
+    'улица', 'площадь', 'музей', 'театр', 'кофе', 'чай', 'история',
+    'путешествие', 'фотография', 'прогулка', 'встреча', 'праздник',
+    'старый', 'новый', 'тихий', 'яркий', 'долгий', 'короткий', 'тёплый',
+    'холодный', 'красивый', 'большой', 'маленький', 'далёкий', 'любимый',
+    'увидел', 'нашёл', 'прошёл', 'вспомнил', 'решил', 'рассказал',
+    'показал', 'услышал', 'вернулся', 'остался', 'очень', 'снова',
+    'наконец', 'всегда', 'иногда', 'сегодня', 'вчера', 'потом', 'рядом',
+)
+PLACES = ('Москва', 'Казань', 'Сочи', 'Байкал', 'Карелия', 'Алтай',
+          'Калининград', 'Владивосток', 'Мурманск', 'Ярославль')
+
+
+SENTENCE_POOL_SIZE = 5000
+
+
+def sentence(rng, low=4, high=16):
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return ' '.join(words).capitalize() + '.'
+
+
+def new_ids(model, after):
+    return list(model.objects.filter(pk__gt=after).order_by('pk')
+                .values_list('pk', flat=True))
+
+
+def last_id(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return last or 0
+
+
+def zipf_weights(count, skew):
+    return list(itertools.accumulate(
+        1 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = ('Заполняет БД синтетическими данными для нагрузочного '
+            'тестирования. При одинаковом --seed данные одинаковые.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель закона Ципфа для распределения комментариев '
+                 'и постов по авторам.')
+        parser.add_argument(
+            '--images', type=float, default=0.2,
+            help='Доля постов с картинкой.')
+        parser.add_argument('--image-count', type=int, default=10,
+                            help='Сколько разных картинок сгенерировать.')
+        parser.add_argument('--days', type=int, default=365,
+                            help='За сколько дней распределить посты.')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        seed = options['seed']
+        # Имена пользователей и slug категорий строятся из seed, поэтому
+        # повторный запуск с тем же seed нарушил бы их уникальность.
+        if (User.objects.filter(username__startswith=f'user_{seed}_').exists()
+                or Category.objects.filter(
+                    slug__startswith=f'category-{seed}-').exists()):
+            raise CommandError(
+                f'Данные с --seed {seed} уже есть в БД: укажите другой '
+                '--seed.')
+        self.rng = random.Random(seed)
+        self.options = options
+        # Даты считаются в UTC без часового пояса: так их быстрее
+        # переводить в значения для БД, а сравнивать можно как обычно.
+        self.now = timezone.now().astimezone(dt_timezone.utc).replace(
+            tzinfo=None)
+        self.adapt = connection.ops.adapt_datetimefield_value
+        # Тексты собираются из заранее сгенерированных предложений:
+        # генерировать каждое заново вдвое дольше, чем вставлять строки.
+        self.sentences = [sentence(self.rng)
+                          for _ in range(SENTENCE_POOL_SIZE)]
+        self.titles = [sentence(self.rng, 2, 6)[:-1]
+                       for _ in range(SENTENCE_POOL_SIZE)]
+        started = time.perf_counter()
+        with transaction.atomic():
+            users = self.step('Пользователи', self.create_users)
+            categories = self.step('Категории', self.create_categories)
+            locations = self.step('Местоположения', self.create_locations)
+            images = self.step('Картинки', self.create_images)
+            posts = self.step('Посты', self.create_posts,
+                              users, categories, locations, images)
+            self.step('Комментарии', self.create_comments, users, posts)
+            self.step('Лента', feed.rebuild)
+            self.step('Поисковый индекс', search.rebuild_index)
+        invalidate('feed', 'users', COUNT_TAG)
+        reset_next_publication()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с'))
+
+    def step(self, name, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        count = len(result) if isinstance(result, (list, dict)) else result
+        self.stdout.write(
+            f'{name}: {count if count is not None else "-"} '
+            f'({time.perf_counter() - started:.1f} с)')
+        return result
+
+    def paragraph(self, sentences):
+        return ' '.join(self.rng.choices(self.sentences, k=sentences))
+
+    def create_users(self):
+        seed, after = self.options['seed'], last_id(User)
+        # Хэш пароля считается один раз: PBKDF2 на каждого пользователя
+        # занял бы больше времени, чем всё остальное.
+        password = make_password('password')
+        joined = self.adapt(self.now)
+        insert_rows(User, [
+            'username', 'password', 'first_name', 'last_name', 'email',
+            'is_staff', 'is_active', 'is_superuser', 'date_joined',
+        ], (
+            (f'user_{seed}_{n}', password, '', '', '', False, True, False,
+             joined)
+            for n in range(self.options['users'])
+        ), self.options['batch_size'])
+        return new_ids(User, after)
+
+    def create_categories(self):
+        seed, after = self.options['seed'], last_id(Category)
+        created = self.adapt(self.now)
+        insert_rows(Category, [
+            'title', 'description', 'slug', 'is_published', 'created_at',
+        ], (
+            (f'Категория {n}', self.paragraph(2),
+             f'category-{seed}-{n}', self.rng.random() < 0.9, created)
+            for n in range(self.options['categories'])
+        ), self.options['batch_size'])
+        return new_ids(Category, after)
+
+    def create_locations(self):
+        after = last_id(Location)
+        created = self.adapt(self.now)
+        insert_rows(Location, ['name', 'is_published', 'created_at'], (
+            (f'{self.rng.choice(PLACES)} {n}', self.rng.random() < 0.9,
+             created)
+            for n in range(self.options['locations'])
+        ), self.options['batch_size'])
+        return new_ids(Location, after)
+
+    def create_images(self):
+        names = []
+        if not self.options['images']:
+            return names
+        for n in range(self.options['image_count']):
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            buffer = BytesIO()
+            Image.new('RGB', (1200, 800), color).save(buffer, 'JPEG')
+            names.append(default_storage.save(
+                f'posts/synthetic_{self.options["seed"]}_{n}.jpg',
+                ContentFile(buffer.getvalue())))
+        return names
+
+    def create_posts(self, users, categories, locations, images):
+        """Посты; возвращает {id: дата публикации}."""
+        rng, options = self.rng, self.options
+        after = last_id(Post)
+        # Немногие авторы пишут большую часть постов.
+        author_weights = zipf_weights(len(users), options['skew'])
+        span = options['days'] * 24 * 60 * 60
+        pub_dates = []
+
+        def rows():
+            created = self.adapt(self.now)
+            for _ in range(options['posts']):
+                # 1% постов запланирован на будущее.
+                offset = (-rng.randrange(1, 7 * 24 * 60 * 60)
+                          if rng.random() < 0.01 else rng.randrange(span))
+                pub_date = self.now - timedelta(seconds=offset)
+                pub_dates.append(pub_date)
+                is_published = rng.random() < 0.95
+                image = ''
+                if images and rng.random() < options['images']:
+                    image = rng.choice(images)
+                yield (
+                    rng.choice(self.titles),
+                    '\n\n'.join(self.paragraph(rng.randint(2, 6))
+                                for _ in range(rng.randint(1, 4))),
+                    self.adapt(pub_date),
+                    rng.choices(users, cum_weights=author_weights)[0],
+                    (rng.choice(locations)
+                     if locations and rng.random() < 0.7 else None),
+                    rng.choice(categories) if categories else None,
+                    is_published,
+                    created,
+                    image,
+                    0,
+                    is_published and pub_date <= self.now,
+                )
+
+        insert_rows(Post, [
+            'title', 'text', 'pub_date', 'author', 'location', 'category',
+            'is_published', 'created_at', 'image', 'comment_count',
+            'is_visible',
+        ], rows(), options['batch_size'])
+        return dict(zip(new_ids(Post, after), pub_dates))
+
+    def create_comments(self, users, posts):
+        rng, options = self.rng, self.options
+        if not posts or not users:
+            return 0
+        # Отложенные посты ещё никто не видел.
+        post_ids = [pk for pk, pub_date in posts.items()
+                    if pub_date <= self.now]
+        # Порядок «популярности» не совпадает с порядком создания.
+        popular = post_ids[:]
+        rng.shuffle(popular)
+        counts = Counter(rng.choices(
+            popular, cum_weights=zipf_weights(len(popular), options['skew']),
+            k=options['comments']))
+        month = 30 * 24 * 60 * 60
+
+        def rows():
+            # Комментарии идут по постам и по времени: вставка в индексы
+            # (post, created_at) тогда почти последовательная.
+            for post_id in post_ids:
+                pub_date = posts[post_id]
+                window = min((self.now - pub_date).total_seconds(), month)
+                offsets = sorted(rng.random() * window
+                                 for _ in range(counts[post_id]))
+                for offset in offsets:
+                    yield (
+                        post_id,
+                        rng.choice(users),
+                        rng.choice(self.sentences),
+                        self.adapt(pub_date + timedelta(seconds=offset)),
+                    )
+
+        insert_rows(Comment, ['post', 'author', 'text', 'created_at'],
+                    rows(), options['batch_size'])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {Post._meta.db_table} SET comment_count = %s '
+                'WHERE id = %s',
+                [(count, pk) for pk, count in counts.items() if count])
+        return options['comments']
@@ -0,0 +1,89 @@
+import os
+import posixpath
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.cache import invalidate
+from blog.images import (IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_WIDTHS,
+                         forget_srcsets, generate_variants, has_variants,
+                         variant_names)
+from blog.models import Post
+
+# Сколько обработанных изображений копить перед сбросом тегов постов.
+INVALIDATE_BATCH_SIZE = 100
+
+
+def legacy_variant_names(name):
+    """Имена копий до того, как в них вошло расширение оригинала."""
+    dirname, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    legacy = [posixpath.join(dirname, 'variants', f'{stem}_{width}.{ext}')
+              for width in IMAGE_VARIANT_WIDTHS
+              for ext, _ in IMAGE_VARIANT_FORMATS]
+    # У файла без расширения старые и новые имена совпадают.
+    return [path for path in legacy if path not in variant_names(name)]
+
+
+def backfill(name):
+    """Создаёт копии изображения и удаляет копии со старыми именами."""
+    created = generate_variants(name)
+    for path in legacy_variant_names(name):
+        default_storage.delete(path)
+    return created
+
+
+class Command(BaseCommand):
+    help = ('Создаёт уменьшенные копии изображений существующих постов '
+            'в пуле процессов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--force', action='store_true',
+                            help='Пересоздать уже существующие копии.')
+
+    def handle(self, *args, workers, force, **options):
+        posts = defaultdict(list)
+        for pk, name in (Post.objects.exclude(image='')
+                         .exclude(image__isnull=True)
+                         .values_list('pk', 'image').iterator()):
+            posts[name].append(pk)
+        names = [name for name in posts if force or not has_variants(name)]
+        # Дочерним процессам не нужны унаследованные соединения с БД.
+        connections.close_all()
+        created = failed = 0
+        done = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(backfill, name): name
+                       for name in names}
+            for future in as_completed(futures):
+                try:
+                    created += len(future.result())
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'{futures[future]}: {error}')
+                else:
+                    done.append(futures[future])
+                if len(done) >= INVALIDATE_BATCH_SIZE:
+                    self.invalidate(done, posts)
+                    done = []
+        self.invalidate(done, posts)
+        self.stdout.write(self.style.SUCCESS(
+            f'Изображений: {len(names)}, создано копий: {created}, '
+            f'ошибок: {failed}'))
+
+    def invalidate(self, names, posts):
+        """Сбрасывает кэш srcset и карточек постов с этими изображениями.
+
+        Дочерние процессы сбрасывают кэш srcset только у себя, если кэш
+        не общий, поэтому это делает родительский процесс.
+        """
+        if not names:
+            return
+        for name in names:
+            forget_srcsets(name)
+        invalidate('feed', *(f'post:{pk}' for name in names
+                             for pk in posts[name]))
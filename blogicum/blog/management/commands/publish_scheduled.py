@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.visibility import (next_publication, publish_due_posts,
+                             reset_next_publication)
+
+
+class Command(BaseCommand):
+    help = ('Делает видимыми посты, время публикации которых наступило. '
+            'С --loop работает как планировщик.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать следующей публикации.')
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Наибольшая пауза между проверками, секунд.')
+
+    def handle(self, *args, loop, max_sleep, **options):
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(f'Опубликовано постов: {published}')
+            if not loop:
+                return
+            # Новые отложенные посты могли появиться в другом процессе.
+            reset_next_publication()
+            moment = next_publication()
+            pause = max_sleep
+            if moment is not None:
+                seconds = (moment - timezone.now()).total_seconds()
+                pause = min(max_sleep, max(seconds, 0))
+            time.sleep(pause)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.feed import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Заново собирает таблицу ленты FeedEntry из постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        total = rebuild(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Записей в ленте: {total}'))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.cache import invalidate_on_commit
+from blog.models import Comment, FeedEntry, Post
+
+
+def actual_comment_count():
+    return Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk'))
+        .order_by().values('post').annotate(total=Count('pk'))
+        .values('total')
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count и исправляет расхождения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать число расхождений.')
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        last_pk = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+        total = 0
+        for start in range(0, last_pk + 1, batch_size):
+            drifted = (Post.objects
+                       .filter(pk__gte=start, pk__lt=start + batch_size)
+                       .annotate(actual=actual_comment_count())
+                       .exclude(comment_count=F('actual')))
+            if dry_run:
+                total += drifted.count()
+                continue
+            with transaction.atomic():
+                pks = list(drifted.values_list('pk', flat=True))
+                total += Post.objects.filter(
+                    pk__in=pks).update(comment_count=actual_comment_count())
+                FeedEntry.objects.filter(pk__in=pks).update(
+                    comment_count=Subquery(
+                        Post.objects.filter(pk=OuterRef('pk'))
+                        .values('comment_count')))
+                if pks:
+                    invalidate_on_commit(
+                        'feed', *(f'post:{pk}' for pk in pks))
+        verb = 'Найдено расхождений' if dry_run else 'Исправлено постов'
+        self.stdout.write(self.style.SUCCESS(f'{verb}: {total}'))
@@ -0,0 +1,108 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from blog.jobs import claim, purge, queue_stats, run
+
+
+class Metrics:
+    """Счётчики обработчика; обновляются из потоков пула."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.outcomes = {'done': 0, 'retry': 0, 'failed': 0, 'lost': 0}
+        self.busy = 0.0
+
+    def record(self, outcome, seconds):
+        with self.lock:
+            self.outcomes[outcome] += 1
+            self.busy += seconds
+
+    def summary(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            finished = sum(self.outcomes.values())
+            mean = self.busy / finished * 1000 if finished else 0
+            return (
+                f'выполнено {self.outcomes["done"]} '
+                f'({self.outcomes["done"] / elapsed:.1f}/с), '
+                f'повторов {self.outcomes["retry"]}, '
+                f'ошибок {self.outcomes["failed"]}, '
+                f'потеряна аренда {self.outcomes["lost"]}, '
+                f'в среднем {mean:.0f} мс на задачу'
+            )
+
+
+def wait_any(running, timeout):
+    """Ждёт завершения любой из задач; возвращает ещё выполняющиеся."""
+    if not running:
+        time.sleep(timeout)
+        return running
+    done, running = wait(running, timeout=timeout,
+                         return_when=FIRST_COMPLETED)
+    for future in done:
+        future.result()
+    return running
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из таблицы Job (BACKGROUND_JOBS) '
+            'в пуле потоков. Обработчиков можно запустить несколько.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--poll', type=float, default=1,
+                            help='Пауза, когда задач нет, секунд.')
+        parser.add_argument('--stats-interval', type=float, default=60,
+                            help='Как часто выводить метрики, секунд.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.')
+
+    def handle(self, *args, threads, poll, stats_interval, once,
+               **options):
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        metrics = Metrics()
+        self.stdout.write(f'Обработчик {worker}, потоков: {threads}')
+        with ThreadPoolExecutor(threads) as pool:
+            try:
+                self.work(pool, worker, metrics, threads, poll,
+                          stats_interval, once)
+            except KeyboardInterrupt:
+                self.stdout.write('Остановка: ждём начатые задачи.')
+        self.report(metrics)
+
+    def work(self, pool, worker, metrics, threads, poll, stats_interval,
+             once):
+        """Забирает задачи, пока есть свободные потоки, и ждёт их."""
+        def execute(job):
+            started = time.monotonic()
+            outcome = run(job, worker)
+            metrics.record(outcome, time.monotonic() - started)
+
+        running = set()
+        last_stats = time.monotonic()
+        while True:
+            jobs = []
+            if len(running) < threads:
+                jobs = claim(worker, threads - len(running))
+            running.update(pool.submit(execute, job) for job in jobs)
+            if time.monotonic() - last_stats >= stats_interval:
+                last_stats = time.monotonic()
+                purge()
+                self.report(metrics)
+            if once and not jobs and not running:
+                return
+            # Задачи только что взяты — сразу пробуем взять ещё.
+            running = wait_any(running, 0 if jobs else poll)
+
+    def report(self, metrics):
+        stats = queue_stats()
+        self.stdout.write(
+            f'{metrics.summary()}; в очереди {stats["queued"]}, '
+            f'выполняется {stats["running"]}')
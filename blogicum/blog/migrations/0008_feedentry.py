@@ -0,0 +1,74 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import Truncator
+
+
+def fill_feed(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    posts = Post.objects.filter(
+        is_visible=True, category__is_published=True
+    ).select_related('author', 'category', 'location')
+    FeedEntry.objects.bulk_create(
+        FeedEntry(
+            post_id=post.pk,
+            title=post.title,
+            text_preview=Truncator(post.text).words(10),
+            pub_date=post.pub_date,
+            author_id=post.author_id,
+            author_username=post.author.username,
+            category_id=post.category_id,
+            category_slug=post.category.slug,
+            category_title=post.category.title,
+            location_id=post.location_id,
+            location_name=(post.location.name
+                           if post.location and post.location.is_published
+                           else ''),
+            image=post.image.name if post.image else '',
+            comment_count=post.comment_count,
+        )
+        for post in posts.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='blog.post')),
+                ('title', models.CharField(max_length=256, verbose_name='Заголовок')),
+                ('text_preview', models.TextField(verbose_name='Начало текста')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('author_id', models.BigIntegerField(db_index=True, verbose_name='ID автора')),
+                ('author_username', models.CharField(max_length=150, verbose_name='Имя автора')),
+                ('category_id', models.BigIntegerField(verbose_name='ID категории')),
+                ('category_slug', models.SlugField(verbose_name='Идентификатор категории')),
+                ('category_title', models.CharField(max_length=256, verbose_name='Категория')),
+                ('location_id', models.BigIntegerField(db_index=True, null=True, verbose_name='ID местоположения')),
+                ('location_name', models.CharField(blank=True, max_length=256, verbose_name='Местоположение')),
+                ('image', models.ImageField(blank=True, upload_to='posts', verbose_name='Изображение')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Лента',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['-pub_date', '-post'], name='feed_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['category_id', '-pub_date', '-post'], name='feed_category_date_idx'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
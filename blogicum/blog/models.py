@@ -1,10 +1,15 @@
 from django.db import models
+from django.db.models.functions import Left
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
 
 User = get_user_model()
 
+# Карточке поста нужно только начало текста (truncatewords:10), поэтому
+# в лентах полный текст не загружается.
+POST_PREVIEW_LENGTH = 500
+
 
 class Category(models.Model):
     title = models.CharField("Заголовок", max_length=256)
@@ -47,6 +52,22 @@ class Location(models.Model):
         verbose_name_plural = "Местоположения"
 
 
+class PostQuerySet(models.QuerySet):
+    def feed(self):
+        return (self.select_related('author', 'category', 'location')
+                .annotate(text_preview=Left('text', POST_PREVIEW_LENGTH))
+                .defer('text'))
+
+    def published(self):
+        from .visibility import publish_if_due
+
+        publish_if_due()
+        return self.filter(is_visible=True, category__is_published=True)
+
+    def published_feed(self):
+        return self.published().feed()
+
+
 class Post(models.Model):
     title = models.CharField("Заголовок", max_length=256)
     text = models.TextField("Текст")
@@ -78,13 +99,49 @@ class Post(models.Model):
     created_at = models.DateTimeField("Добавлено", auto_now_add=True)
     image = models.ImageField("Изображение", upload_to="posts",
                               blank=True, null=True)
+    comment_count = models.PositiveIntegerField(
+        "Количество комментариев", default=0, editable=False
+    )
+    is_visible = models.BooleanField(
+        "Виден",
+        default=False,
+        editable=False,
+        help_text="Опубликовано, и время публикации наступило.",
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    @property
+    def is_public(self):
+        """То же условие, что и в PostQuerySet.published()."""
+        return (self.is_visible
+                and self.category is not None
+                and self.category.is_published)
+
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
+        indexes = [
+            models.Index(fields=["is_published", "-pub_date"],
+                         name="post_published_date_idx"),
+            models.Index(fields=["-pub_date", "-id"],
+                         condition=models.Q(is_visible=True),
+                         name="post_visible_date_idx"),
+            models.Index(fields=["author", "-pub_date"],
+                         name="post_author_date_idx"),
+            models.Index(fields=["category", "is_published", "-pub_date"],
+                         name="post_category_date_idx"),
+            models.Index(fields=["category", "-pub_date"],
+                         condition=models.Q(is_visible=True),
+                         name="post_visible_category_idx"),
+            models.Index(fields=["pub_date"],
+                         condition=models.Q(is_published=True,
+                                            is_visible=False),
+                         name="post_scheduled_idx"),
+        ]
 
 
 class Comment(models.Model):
@@ -103,3 +160,120 @@ class Comment(models.Model):
         ordering = ("-created_at",)
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(fields=["post", "created_at"],
+                         name="comment_post_created_idx"),
+        ]
+
+
+class FeedEntry(models.Model):
+    """Готовая строка ленты: всё, что нужно карточке поста, без JOIN.
+
+    Хранятся только публичные посты (см. PostQuerySet.published()).
+    Таблицу поддерживают blog.feed и сигналы, пересобирает команда
+    rebuild_feed.
+    """
+
+    post = models.OneToOneField(Post, on_delete=models.CASCADE,
+                                primary_key=True, related_name="feed_entry")
+    title = models.CharField("Заголовок", max_length=256)
+    text_preview = models.TextField("Начало текста")
+    pub_date = models.DateTimeField("Дата и время публикации")
+    author_id = models.BigIntegerField("ID автора", db_index=True)
+    author_username = models.CharField("Имя автора", max_length=150)
+    category_id = models.BigIntegerField("ID категории")
+    category_slug = models.SlugField("Идентификатор категории")
+    category_title = models.CharField("Категория", max_length=256)
+    location_id = models.BigIntegerField("ID местоположения", null=True,
+                                         db_index=True)
+    location_name = models.CharField("Местоположение", max_length=256,
+                                     blank=True)
+    image = models.ImageField("Изображение", upload_to="posts", blank=True)
+    comment_count = models.PositiveIntegerField(
+        "Количество комментариев", default=0
+    )
+
+    class Meta:
+        verbose_name = "запись ленты"
+        verbose_name_plural = "Лента"
+        indexes = [
+            models.Index(fields=["-pub_date", "-post"],
+                         name="feed_date_idx"),
+            models.Index(fields=["category_id", "-pub_date", "-post"],
+                         name="feed_category_date_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class FullTextField(models.TextField):
+    """Скрытый столбец FTS5 с именем таблицы, по которому ищут MATCH."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class PostSearchIndex(models.Model):
+    """Строка полнотекстового индекса постов (FTS5, только на SQLite).
+
+    Таблицу создаёт миграция, а обновляет blog.search.
+    """
+
+    post = models.OneToOneField(Post, models.DO_NOTHING, primary_key=True,
+                                db_column="rowid",
+                                related_name="search_index")
+    title = models.TextField()
+    text = models.TextField()
+    document = FullTextField(db_column="blog_post_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "blog_post_fts"
+
+
+class Job(models.Model):
+    """Фоновая задача: выполняет команда runworker (см. blog.jobs)."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    ]
+
+    name = models.CharField("Задача", max_length=100)
+    payload = models.JSONField("Аргументы", default=dict)
+    status = models.CharField("Состояние", max_length=10, choices=STATUSES,
+                              default=QUEUED)
+    attempts = models.PositiveIntegerField("Попыток", default=0)
+    max_attempts = models.PositiveIntegerField("Наибольшее число попыток")
+    run_after = models.DateTimeField("Не раньше")
+    locked_by = models.CharField("Обработчик", max_length=100, blank=True)
+    locked_until = models.DateTimeField("Аренда до", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created_at = models.DateTimeField("Добавлена", auto_now_add=True)
+    finished_at = models.DateTimeField("Завершена", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = [
+            models.Index(fields=["status", "run_after"],
+                         name="job_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
@@ -0,0 +1,164 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+# Сколько номеров страниц показывать вокруг текущей и у краёв списка.
+PAGE_RANGE_ON_EACH_SIDE = 2
+PAGE_RANGE_ON_ENDS = 1
+# Наибольший id, который помещается в целочисленный столбец SQLite.
+MAX_PK = 2 ** 63 - 1
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу ``(key, id)`` с курсорами вместо номеров страниц.
+
+    В отличие от ``django.core.paginator.Paginator`` не считает строки и не
+    использует ``OFFSET``: каждая страница — один запрос по индексу на
+    ``per_page + 1`` строк, поэтому глубина страницы не влияет на цену.
+
+    Значение ключа из курсора приводится функцией ``convert``; по умолчанию
+    это ``to_python`` поля модели, а значение должно быть строкой. Для
+    аннотаций (например, ``rank`` поиска) ``convert`` нужно передать явно.
+    """
+
+    cursor_based = True
+
+    def __init__(self, queryset, per_page, key='pub_date', descending=True,
+                 convert=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key = key
+        self.descending = descending
+        self.convert = convert or self._field_value
+
+    def _field_value(self, value):
+        if not isinstance(value, str):
+            raise TypeError(f'Ожидалась строка: {value!r}')
+        try:
+            field = self.queryset.model._meta.get_field(self.key)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def encode_cursor(self, obj, direction):
+        value = getattr(obj, self.key)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        payload = json.dumps([direction, value, obj.pk],
+                             separators=(',', ':'))
+        return base64.urlsafe_b64encode(
+            payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, value, pk = json.loads(
+                base64.urlsafe_b64decode(padded.encode()).decode())
+        except (ValueError, TypeError, binascii.Error,
+                UnicodeDecodeError):
+            raise InvalidCursor(cursor)
+        if (direction not in ('next', 'prev')
+                or type(pk) is not int or not 1 <= pk <= MAX_PK):
+            raise InvalidCursor(cursor)
+        try:
+            value = self.convert(value)
+        except (ValidationError, TypeError, ValueError, OverflowError):
+            raise InvalidCursor(cursor)
+        if value is None:
+            raise InvalidCursor(cursor)
+        return direction, value, pk
+
+    def _ordering(self, forward):
+        descending = self.descending == forward
+        prefix = '-' if descending else ''
+        return (f'{prefix}{self.key}', f'{prefix}pk'), descending
+
+    def _after(self, value, pk, descending):
+        lookup = 'lt' if descending else 'gt'
+        return (Q(**{f'{self.key}__{lookup}': value})
+                | Q(**{self.key: value, f'pk__{lookup}': pk}))
+
+    def page(self, cursor=None):
+        direction, value, pk = ('next', None, None)
+        if cursor:
+            direction, value, pk = self.decode_cursor(cursor)
+        forward = direction == 'next'
+        ordering, descending = self._ordering(forward)
+        queryset = self.queryset.order_by(*ordering)
+        if pk is not None:
+            queryset = queryset.filter(self._after(value, pk, descending))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or not forward:
+                next_cursor = self.encode_cursor(rows[-1], 'next')
+            if (has_more and not forward) or (forward and pk is not None):
+                previous_cursor = self.encode_cursor(rows[0], 'prev')
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def get_page(self, cursor=None):
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+
+def paginate(request, object_list, per_page, count=None):
+    """Страница по номеру из ``?page=`` со списком номеров для шаблона.
+
+    Неверный номер даёт первую страницу, слишком большой — последнюю.
+    ``count`` — заранее известное число строк (см. blog.counts), тогда
+    ``COUNT(*)`` не выполняется.
+    В ``page_obj.elided_page_range`` — первые и последние номера и окно
+    вокруг текущего, пропуски обозначены ``Paginator.ELLIPSIS``: полный
+    ``page_range`` для больших лент раздувал бы страницу.
+    """
+    paginator = Paginator(object_list, per_page)
+    if count is not None:
+        paginator.count = count
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.elided_page_range = list(paginator.get_elided_page_range(
+        page_obj.number, on_each_side=PAGE_RANGE_ON_EACH_SIDE,
+        on_ends=PAGE_RANGE_ON_ENDS))
+    return page_obj
@@ -0,0 +1,113 @@
+"""Полнотекстовый поиск по постам.
+
+На SQLite поиск идёт по виртуальной таблице FTS5 ``blog_post_fts``
+(rowid — id поста), которую заполняет миграция и обновляют сигналы.
+Результаты упорядочены по релевантности (bm25). На других СУБД, а также
+если SQLite собран без FTS5, используется поиск ``icontains`` по
+заголовку и тексту с сортировкой по дате.
+"""
+import functools
+import math
+
+from django.db import connection
+from django.db.models import F, Q
+
+from .models import Post, PostSearchIndex
+from .paginators import CursorPaginator
+
+FTS_TABLE = PostSearchIndex._meta.db_table
+SEARCH_PER_PAGE = 10
+
+
+@functools.lru_cache(maxsize=None)
+def _fts_table_exists(vendor, name):
+    if vendor != 'sqlite':
+        return False
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def fts_enabled():
+    return _fts_table_exists(connection.vendor,
+                             str(connection.settings_dict['NAME']))
+
+
+def fts_query(text):
+    """Запрос FTS5, в котором каждое слово — отдельная фраза в кавычках.
+
+    Так пользовательский ввод не разбирается как синтаксис FTS5, а все
+    слова должны встретиться в посте.
+    """
+    return ' '.join(
+        '"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+def index_posts(posts):
+    if not fts_enabled():
+        return
+    posts = list(posts)
+    if any(post.pk is None for post in posts):
+        raise ValueError('Индексировать можно только сохранённые посты.')
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(post.pk,) for post in posts])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [(post.pk, post.title, post.text) for post in posts])
+
+
+def unindex_posts(post_ids):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [(pk,) for pk in post_ids])
+
+
+def rebuild_index():
+    """Заново заполняет индекс всеми постами."""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            f'SELECT id, title, text FROM {Post._meta.db_table}')
+
+
+def search_posts(text, fts=None):
+    """Видимые посты, подходящие под запрос.
+
+    С FTS5 у постов есть аннотация ``rank``: чем меньше, тем выше пост в
+    выдаче. ``fts=False`` принудительно включает запасной поиск.
+    """
+    posts = Post.objects.published_feed()
+    if fts is None:
+        fts = fts_enabled()
+    if not fts:
+        return posts.filter(Q(title__icontains=text)
+                            | Q(text__icontains=text))
+    return posts.filter(
+        search_index__document__match=fts_query(text)
+    ).annotate(rank=F('search_index__rank'))
+
+
+def parse_rank(value):
+    """Ранг из курсора выдачи: конечное число."""
+    if isinstance(value, bool):
+        raise TypeError(f'Ожидалось число: {value!r}')
+    rank = float(value)
+    if not math.isfinite(rank):
+        raise ValueError(f'Ожидалось конечное число: {value!r}')
+    return rank
+
+
+def search_paginator(text, per_page=SEARCH_PER_PAGE, fts=None):
+    if fts is None:
+        fts = fts_enabled()
+    posts = search_posts(text, fts)
+    if fts:
+        return CursorPaginator(posts, per_page, key='rank', descending=False,
+                               convert=parse_rank)
+    return CursorPaginator(posts, per_page)
@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import feed, search
+from .cache import invalidate_on_commit
+from .counts import COUNT_TAG
+from .models import Category, Comment, FeedEntry, Location, Post
+from .visibility import reset_next_publication
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Post)
+def update_post_visibility(sender, instance, **kwargs):
+    instance.is_visible = (instance.is_published
+                           and instance.pub_date <= timezone.now())
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    invalidate_on_commit(f'post:{instance.pk}', 'feed', COUNT_TAG)
+    reset_next_publication()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        # loaddata может загрузить пост раньше его автора или категории:
+        # запись ленты собирается, когда фикстура загружена целиком.
+        transaction.on_commit(lambda: feed.sync_posts([instance.pk]))
+    else:
+        feed.sync_posts([instance.pk])
+    search.index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    search.unindex_posts([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    invalidate_on_commit(f'category:{instance.pk}', 'feed', COUNT_TAG)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    feed.sync_category(instance)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    # Посты остаются без категории и перестают быть публичными.
+    FeedEntry.objects.filter(category_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(sender, instance, **kwargs):
+    invalidate_on_commit(f'location:{instance.pk}', 'feed')
+
+
+@receiver(post_save, sender=Location)
+def location_saved(sender, instance, **kwargs):
+    feed.sync_location(instance)
+
+
+@receiver(post_delete, sender=Location)
+def location_deleted(sender, instance, **kwargs):
+    FeedEntry.objects.filter(location_id=instance.pk).update(
+        location_id=None, location_name='')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    invalidate_on_commit(f'post:{instance.post_id}', 'feed')
+
+
+def only_last_login(update_fields):
+    # Вход пользователя обновляет только last_login, который
+    # на страницах блога не отображается.
+    return bool(update_fields) and set(update_fields) == {'last_login'}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if not only_last_login(update_fields):
+        invalidate_on_commit(f'user:{instance.pk}', 'users', 'feed')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    if not only_last_login(update_fields):
+        feed.sync_author(instance)
@@ -0,0 +1,130 @@
+"""Статика с хэшами в именах и заранее сжатыми копиями.
+
+``collectstatic`` с хранилищем CompressedManifestStaticFilesStorage кладёт
+рядом с каждым текстовым файлом копии ``.gz`` и, если установлен пакет
+``brotli``, ``.br``. Представление ``serve`` отдаёт сжатую копию по
+заголовку Accept-Encoding, а файлы с хэшем в имени — с Cache-Control
+immutable: при изменении содержимого меняется и имя.
+"""
+import functools
+import gzip
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.html', '.json', '.xml',
+)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+STATIC_CACHE_CONTROL = 'public, max-age=3600'
+
+
+def compress_gzip(content):
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=11)
+
+
+def encodings():
+    """Тройки (Content-Encoding, расширение, функция сжатия) по приоритету."""
+    available = [('gzip', '.gz', compress_gzip)]
+    if brotli is not None:
+        available.insert(0, ('br', '.br', compress_brotli))
+    return available
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(self.hashed_files) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            content = source.read()
+        for _, suffix, compress in encodings():
+            compressed = compress(content)
+            # Мелкие файлы сжатие может только увеличить.
+            if len(compressed) < len(content):
+                with open(path + suffix, 'wb') as target:
+                    target.write(compressed)
+
+
+def accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        name, _, value = params.strip().partition('=')
+        try:
+            quality = float(value) if name.strip() == 'q' else 1
+        except ValueError:
+            quality = 1
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+@functools.lru_cache(maxsize=None)
+def hashed_names():
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None) or {}
+    return frozenset(hashed_files.values())
+
+
+def is_hashed(name):
+    return name in hashed_names()
+
+
+def serve(request, path):
+    """Отдаёт файл из STATIC_ROOT, по возможности сжатую копию."""
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                              stat.st_mtime, stat.st_size):
+        return HttpResponseNotModified()
+    content_type = (mimetypes.guess_type(name)[0]
+                    or 'application/octet-stream')
+    accepted = accepted_encodings(request)
+    content_encoding, served = None, fullpath
+    for coding, suffix, _ in encodings():
+        if coding in accepted and os.path.isfile(fullpath + suffix):
+            content_encoding, served = coding, fullpath + suffix
+            break
+    response = FileResponse(open(served, 'rb'), content_type=content_type,
+                            filename=os.path.basename(name))
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = (IMMUTABLE_CACHE_CONTROL if is_hashed(name)
+                                 else STATIC_CACHE_CONTROL)
+    return response
@@ -0,0 +1,45 @@
+"""Фоновые задачи блога (см. blog.jobs)."""
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from .cache import invalidate
+from .images import (forget_srcsets, generate_variants, no_variants_marker,
+                     variant_names)
+from .jobs import task
+from .models import Post
+
+
+@task('generate_image_variants')
+def generate_image_variants(name, post_id=None):
+    generate_variants(name)
+    if post_id is not None:
+        # Карточка и страница поста могли попасть в кэш ещё без srcset.
+        invalidate(f'post:{post_id}')
+
+
+@task('send_email')
+def send_email(subject, body, from_email, to, cc=(), bcc=(), reply_to=(),
+               headers=None, alternatives=()):
+    message = EmailMultiAlternatives(
+        subject, body, from_email, to, bcc=bcc, cc=cc, reply_to=reply_to,
+        headers=headers, alternatives=[tuple(alternative)
+                                       for alternative in alternatives],
+    )
+    get_connection(settings.JOB_EMAIL_BACKEND).send_messages([message])
+
+
+@task('delete_post_images')
+def delete_post_images(names):
+    """Удаляет изображения удалённых постов вместе с уменьшенными копиями.
+
+    Изображение, на которое ещё ссылается другой пост, остаётся.
+    """
+    used = set(Post.objects.filter(image__in=names)
+               .values_list('image', flat=True))
+    for name in names:
+        if name in used:
+            continue
+        for path in [name, *variant_names(name), no_variants_marker(name)]:
+            default_storage.delete(path)
+        forget_srcsets(name)
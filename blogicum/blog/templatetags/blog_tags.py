@@ -0,0 +1,22 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.cache import render_feed_card, render_post_card
+from blog.images import image_srcsets
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    return mark_safe(render_post_card(post))
+
+
+@register.simple_tag
+def feed_card(entry):
+    return mark_safe(render_feed_card(entry))
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(image):
+    return {'image': image, 'srcsets': image_srcsets(image.name)}
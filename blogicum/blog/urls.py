@@ -6,7 +6,11 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('search/', views.search, name='search'),
+    path('export/<str:kind>/', views.export, name='export'),
     path('posts/<int:pk>/', views.post_detail, name='post_detail'),
+    path('posts/<int:pk>/comments/', views.post_comments,
+         name='post_comments'),
     path('category/<slug:category_slug>/', views.category_posts,
          name='category_posts'),
     path('profile/<str:username>/', views.ProfileView.as_view(),
@@ -1,18 +1,33 @@
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
-from django.utils import timezone
-from .models import Category, Post, Comment
+from .models import Category, Post, Comment, FeedEntry
 from django.views.generic import DetailView, UpdateView
 from django.contrib.auth.models import User
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from .forms import CommentForm, CommentUpdateForm, ProfileEditForm, PostForm
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.http import Http404
-
-
+from django.db import transaction
+from django.http import (Http404, HttpResponseBadRequest,
+                         StreamingHttpResponse)
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils.decorators import method_decorator
+from . import comment_queue
+from .cache import anonymous_page_cache, post_card_tags, with_cache_tags
+from .export import FORMATS, ExportError, export_lines
+from .feed import adjust_comment_count
+from .counts import listing_count
+from .deletion import delete_posts
+from .conditional import feed_condition, post_condition
+from .jobs import enqueue
+from .paginators import CursorPaginator, paginate
+from .search import search_paginator
+from .visibility import publish_if_due
+
+COMMENTS_PER_PAGE = 50
+
+
+@method_decorator(feed_condition, name='get')
 class ProfileView(DetailView):
     model = User
     template_name = 'blog/profile.html'
@@ -26,24 +41,16 @@ class ProfileView(DetailView):
         current_user = self.request.user
 
         filters = {}
+        listing = f'user:{self.object.pk}:all'
         if current_user != self.object:
-            filters.update({
-                'is_published': True,
-                'pub_date__lte': timezone.now(),
-            })
-        page_obj = (Post.objects
-                    .filter(author=self.object, **filters)
-                    .annotate(comment_count=Count('comments'))
-                    .order_by('-pub_date'))
-        paginator = Paginator(page_obj, 10)
-        page_number = self.request.GET.get('page')
-        try:
-            page_obj = paginator.page(page_number)
-        except PageNotAnInteger:
-            page_obj = paginator.page(1)
-        except EmptyPage:
-            page_obj = paginator.page(paginator.num_pages)
-        context['page_obj'] = page_obj
+            publish_if_due()
+            filters['is_visible'] = True
+            listing = f'user:{self.object.pk}:public'
+        posts = (Post.objects.feed()
+                 .filter(author=self.object, **filters)
+                 .order_by('-pub_date'))
+        context['page_obj'] = paginate(
+            self.request, posts, 10, listing_count(listing, posts))
         return context
 
 
@@ -68,6 +75,9 @@ def create_post(request):
             post = form.save(commit=False)
             post.author = request.user
             post.save()
+            if post.image:
+                enqueue('generate_image_variants', name=post.image.name,
+                        post_id=post.pk)
             return redirect("blog:profile", username=request.user.username)
     else:
         form = PostForm()
@@ -82,7 +92,10 @@ def update_post(request, pk):
     if request.method == "POST":
         form = PostForm(request.POST, request.FILES, instance=post)
         if form.is_valid():
-            form.save()
+            post = form.save()
+            if post.image and 'image' in form.changed_data:
+                enqueue('generate_image_variants', name=post.image.name,
+                        post_id=post.pk)
             return redirect("blog:post_detail", pk=post.pk)
     else:
         form = PostForm(instance=post)
@@ -96,10 +109,16 @@ def add_comment(request, post_pk):
     if request.method == "POST":
         form = CommentForm(request.POST)
         if form.is_valid():
+            if comment_queue.is_enabled():
+                comment_queue.enqueue(post, request.user,
+                                      form.cleaned_data['text'])
+                return redirect("blog:post_detail", pk=post.pk)
             comment = form.save(commit=False)
             comment.post = post
             comment.author = request.user
-            comment.save()
+            with transaction.atomic():
+                comment.save()
+                adjust_comment_count(post.pk, 1)
             return redirect("blog:post_detail", pk=post.pk)
     else:
         form = CommentForm()
@@ -113,7 +132,7 @@ def delete_post(request, pk):
     if request.user != post.author:
         return redirect("blog:post_detail", pk=post.pk)
     if request.method == "POST":
-        post.delete()
+        delete_posts([post.pk])
         return redirect("blog:profile", username=request.user.username)
     return render(request, "blog/create.html",
                   {"post": post})
@@ -125,7 +144,11 @@ def delete_comment(request, post_pk, comment_pk):
     if request.user != comment.author:
         return redirect("blog:post_detail", pk=post_pk)
     if request.method == "POST":
-        comment.delete()
+        with transaction.atomic():
+            # Повторная отправка формы не должна уменьшать счётчик ещё раз.
+            deleted, _ = comment.delete()
+            if deleted:
+                adjust_comment_count(comment.post_id, -1)
         return redirect("blog:post_detail", pk=post_pk)
     return render(request, "blog/comment.html",
                   {"comment": comment})
@@ -151,66 +174,107 @@ def update_comment(request, post_pk, comment_pk):
                   {"form": form, "post": post, "comment": comment})
 
 
+@feed_condition
+@anonymous_page_cache
 def index(request):
-    now = timezone.now()
-    posts = Post.objects.filter(
-        pub_date__lte=now, is_published=True, category__is_published=True
-    ).annotate(comment_count=Count('comments')).order_by("-pub_date")
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+    publish_if_due()
+    paginator = CursorPaginator(FeedEntry.objects.all(), 10)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     context = {'page_obj': page_obj}
-    return render(request, "blog/index.html", context)
+    return with_cache_tags(render(request, "blog/index.html", context),
+                           'feed')
+
+
+def search(request):
+    # Выдача не кэшируется целиком: запросов слишком много разных.
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        page_obj = search_paginator(query).get_page(request.GET.get('cursor'))
+    context = {'query': query, 'page_obj': page_obj}
+    return render(request, 'blog/search.html', context)
 
 
+@feed_condition
+@anonymous_page_cache
 def category_posts(request, category_slug):
-    now = timezone.now()
     category = get_object_or_404(Category, slug=category_slug,
                                  is_published=True)
-    posts = Post.objects.filter(
-        category=category, is_published=True, pub_date__lte=now
-    ).order_by("-pub_date")
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
-    context = {"page_obj": page_obj, "category": category}
-    return render(request, "blog/category.html", context)
-
-
+    publish_if_due()
+    posts = (FeedEntry.objects
+             .filter(category_id=category.pk)
+             .order_by("-pub_date", "-post"))
+    count = listing_count(f'category:{category.pk}', posts)
+    context = {"page_obj": paginate(request, posts, 10, count),
+               "category": category}
+    return with_cache_tags(render(request, "blog/category.html", context),
+                           'feed')
+
+
+def get_visible_post(request, pk):
+    publish_if_due()
+    post = (Post.objects.select_related('author', 'category', 'location')
+            .filter(pk=pk).first())
+    if post is None or not (post.is_public
+                            or post.author_id == request.user.pk):
+        raise Http404("Пост не найден")
+    return post
+
+
+def get_comments_page(request, post):
+    comments = (Comment.objects.filter(post=post)
+                .select_related('author'))
+    paginator = CursorPaginator(comments, COMMENTS_PER_PAGE,
+                                key='created_at', descending=False)
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+@post_condition
+@anonymous_page_cache
 def post_detail(request, pk):
-    now = timezone.now()
-
-    try:
-        post = Post.objects.get(
-            pk=pk,
-            is_published=True,
-            pub_date__lte=now,
-            category__is_published=True
-        )
-    except Post.DoesNotExist:
-        if request.user.is_authenticated:
-            try:
-                post = Post.objects.get(pk=pk, author=request.user)
-            except Post.DoesNotExist:
-                raise Http404("Пост не найден")
-        else:
-            raise Http404("Пост не найден")
-
-    comments = Comment.objects.filter(post=post).order_by('created_at')
+    post = get_visible_post(request, pk)
     form = CommentForm()
     context = {
         "post": post,
-        "comments": comments,
+        "comments": get_comments_page(request, post),
+        "pending_comments": comment_queue.pending_comments(post,
+                                                           request.user),
         'form': form,
     }
-    return render(request, "blog/detail.html", context)
+    return with_cache_tags(render(request, "blog/detail.html", context),
+                           *post_card_tags(post), 'users')
+
+
+@post_condition
+@anonymous_page_cache
+def post_comments(request, pk):
+    post = get_visible_post(request, pk)
+    context = {
+        "post": post,
+        "comments": get_comments_page(request, post),
+        "pending_comments": comment_queue.pending_comments(post,
+                                                           request.user),
+    }
+    return with_cache_tags(
+        render(request, "includes/comment_list.html", context),
+        *post_card_tags(post), 'users')
+
+
+@staff_member_required
+def export(request, kind):
+    export_format = request.GET.get('format', 'ndjson')
+    try:
+        lines = export_lines(
+            kind, export_format,
+            author=request.GET.get('author'),
+            category=request.GET.get('category'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+    except ExportError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(
+        lines, content_type=f'{FORMATS[export_format]}; charset=utf-8')
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{export_format}"')
+    return response
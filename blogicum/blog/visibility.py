@@ -0,0 +1,74 @@
+"""Отложенные публикации.
+
+Пост виден, когда он опубликован и наступило время публикации. Это
+состояние хранится в ``Post.is_visible``: его выставляет сигнал при
+сохранении поста, а для постов, чьё время наступило позже, — функция
+``publish_due_posts``. Её вызывают команда ``publish_scheduled`` и, как
+только наступает время ближайшей публикации, сами страницы блога. Время
+ближайшей публикации хранится в кэше, поэтому в остальное время проверка
+не обращается к БД.
+"""
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .cache import get_cache, invalidate_on_commit
+from .counts import COUNT_TAG
+
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+# Значение в кэше, означающее «отложенных публикаций нет».
+NO_PUBLICATION = 'none'
+
+
+def next_publication():
+    """Время ближайшей отложенной публикации или None."""
+    from .models import Post
+
+    cache = get_cache()
+    value = cache.get(NEXT_PUBLICATION_KEY)
+    if value is None:
+        value = Post.objects.filter(
+            is_published=True, is_visible=False
+        ).aggregate(next=Min('pub_date'))['next'] or NO_PUBLICATION
+        cache.set(NEXT_PUBLICATION_KEY, value, None)
+    return None if value == NO_PUBLICATION else value
+
+
+def reset_next_publication():
+    get_cache().delete(NEXT_PUBLICATION_KEY)
+
+
+def publish_due_posts(now=None, since=None):
+    """Делает видимыми посты, время публикации которых наступило.
+
+    С ``since`` теги меняются и у постов, опубликованных с этого момента
+    другим процессом: если кэш не общий (LocMemCache), версии тегов
+    ``publish_scheduled`` меняет только в своём кэше.
+    """
+    from .feed import sync_posts
+    from .models import Post
+
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = list(Post.objects.filter(
+            is_published=True, is_visible=False, pub_date__lte=now
+        ).values_list('pk', flat=True))
+        if due:
+            Post.objects.filter(pk__in=due).update(is_visible=True)
+            sync_posts(due)
+        changed = set(due)
+        if since is not None:
+            changed.update(Post.objects.filter(
+                is_visible=True, pub_date__gte=since, pub_date__lte=now
+            ).values_list('pk', flat=True))
+        if changed:
+            invalidate_on_commit('feed', COUNT_TAG,
+                                 *(f'post:{pk}' for pk in changed))
+    reset_next_publication()
+    return len(due)
+
+
+def publish_if_due():
+    moment = next_publication()
+    if moment is not None and moment <= timezone.now():
+        publish_due_posts(since=moment)
@@ -0,0 +1,20 @@
+"""
+Settings profile is selected by the DJANGO_PROFILE environment variable:
+``dev`` (default) for local development, ``prod`` for deployment.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+SETTINGS_PROFILE = os.getenv('DJANGO_PROFILE', 'dev')
+
+if SETTINGS_PROFILE == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif SETTINGS_PROFILE == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'Unknown DJANGO_PROFILE {SETTINGS_PROFILE!r}, '
+        'expected "dev" or "prod".'
+    )
@@ -0,0 +1,263 @@
+"""
+Django settings for blogicum project, shared by all profiles.
+
+Generated by 'django-admin startproject' using Django 3.2.16.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/3.2/ref/settings/
+"""
+
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-2x6h+0@6csj5(yq(kz&h!z^vxvld7@=xlheht5vxy-@f$wr18f'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+]
+
+TEMPLATES_DIR = BASE_DIR / 'templates'
+
+# Application definition
+
+INSTALLED_APPS = [
+    'blog.apps.BlogConfig',
+    'pages.apps.PagesConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'django_bootstrap5',
+]
+
+MIDDLEWARE = [
+    'blog.instrumentation.ServerTimingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'blogicum.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'blog.instrumentation.InstrumentedDjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+
+STATICFILES_DIRS = [
+    BASE_DIR / 'static_dev',
+]
+
+
+WSGI_APPLICATION = 'blogicum.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        # Persistent connections: seconds to keep a connection open,
+        # 0 closes it after every request.
+        'CONN_MAX_AGE': int(os.getenv('DJANGO_CONN_MAX_AGE', '60')),
+        'OPTIONS': {
+            # Seconds to wait for a lock held by another connection.
+            'timeout': float(os.getenv('SQLITE_TIMEOUT', '5')),
+        },
+    }
+}
+
+# PRAGMA statements applied to every new SQLite connection
+# (blog.db.configure_sqlite). WAL lets readers work while a comment is
+# being written; synchronous=NORMAL is safe in WAL mode.
+# A negative cache_size is in KiB.
+
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-20000')),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024))),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'memory'),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# For a file-based cache set DJANGO_CACHE_BACKEND to
+# django.core.cache.backends.filebased.FileBasedCache and
+# DJANGO_CACHE_LOCATION to a directory.
+# Cache tags live in this cache, so management commands running in
+# another process (publish_scheduled --loop, recount_comments,
+# rebuild_feed) invalidate the web process's pages only when the cache
+# is shared, i.e. not LocMemCache.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'blogicum'),
+    }
+}
+
+# Rendered post cards, keyed by post id and the versions of the objects
+# shown on the card.
+POST_CARD_CACHE = 'default'
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Whole-page cache of the feed, category and post pages for anonymous
+# visitors. Entries never outlive the next scheduled publication.
+ANONYMOUS_PAGE_CACHE = os.getenv('ANONYMOUS_PAGE_CACHE', '') == '1'
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 5 * 60
+
+# Cached post counts of paginated listings (blog.counts). Counts of at
+# least COUNT_ESTIMATE_THRESHOLD are reused for COUNT_ESTIMATE_TIMEOUT
+# seconds even after the posts change.
+COUNT_CACHE_TIMEOUT = 60 * 60
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv('COUNT_ESTIMATE_THRESHOLD', '10000'))
+COUNT_ESTIMATE_TIMEOUT = int(os.getenv('COUNT_ESTIMATE_TIMEOUT', '600'))
+
+# Write-behind comments (blog.comment_queue): new comments are appended to
+# a journal in COMMENT_QUEUE_DIR and saved by the flush_comments command,
+# which must be running when this is on.
+COMMENT_WRITE_BEHIND = os.getenv('COMMENT_WRITE_BEHIND', '') == '1'
+COMMENT_QUEUE_DIR = os.getenv('COMMENT_QUEUE_DIR',
+                              str(BASE_DIR / 'comment_queue'))
+
+
+# Per-request instrumentation (blog.instrumentation.ServerTimingMiddleware).
+# Requests over a budget are logged as warnings.
+
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '1'))
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', '1') == '1'
+SERVER_TIMING_QUERY_BUDGET = int(os.getenv('SERVER_TIMING_QUERY_BUDGET', '20'))
+SERVER_TIMING_TIME_BUDGET_MS = float(
+    os.getenv('SERVER_TIMING_TIME_BUDGET_MS', '300'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blog.performance': {
+            'handlers': ['console'],
+            'level': os.getenv('PERFORMANCE_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/3.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru-RU'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/3.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'static'
+
+# Serve STATIC_ROOT through blog.staticfiles.serve (pre-compressed copies,
+# long-lived Cache-Control) when no web server sits in front of Django.
+SERVE_STATIC = os.getenv('SERVE_STATIC', '') == '1'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+LOGIN_REDIRECT_URL = 'blog:index'
+
+LOGIN_URL = 'login'
+
+MEDIA_ROOT = BASE_DIR / 'media'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Background jobs (blog.jobs). When on, deferred work such as image
+# variants and mail is stored in the Job table and done by the runworker
+# command; otherwise it runs inline in the request.
+BACKGROUND_JOBS = os.getenv('BACKGROUND_JOBS', '') == '1'
+JOB_MAX_ATTEMPTS = 5
+# Seconds before the first retry, doubled on each further attempt.
+JOB_RETRY_DELAY = 10
+# Seconds a worker owns a claimed job before another one may take it.
+JOB_LEASE = 5 * 60
+# Finished jobs are deleted by runworker after this many seconds.
+JOB_RETENTION = 24 * 60 * 60
+
+# runworker sends queued mail through JOB_EMAIL_BACKEND.
+JOB_EMAIL_BACKEND = EMAIL_BACKEND
+if BACKGROUND_JOBS:
+    EMAIL_BACKEND = 'blog.mail.QueuedEmailBackend'
@@ -0,0 +1,5 @@
+"""Development profile: debug pages, templates re-read on every render."""
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = True
@@ -0,0 +1,83 @@
+"""
+Production profile.
+
+Required environment: DJANGO_SECRET_KEY, DJANGO_ALLOWED_HOSTS
+(comma-separated). Run ``collectstatic`` before starting the server:
+static files are served from the hashed copies in STATIC_ROOT.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, CACHES, TEMPLATES
+
+
+def _required_env(name):
+    value = os.getenv(name, '').strip()
+    if not value:
+        raise ImproperlyConfigured(
+            f'The production profile requires the {name} environment '
+            'variable.')
+    return value
+
+
+DEBUG = os.getenv('DJANGO_DEBUG', '') == '1'
+
+SECRET_KEY = _required_env('DJANGO_SECRET_KEY')
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in _required_env('DJANGO_ALLOWED_HOSTS').split(',')
+    if host.strip()
+]
+
+# Parsed templates are kept in memory; the debug context processor
+# (sql_queries, debug) is dropped.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor
+            for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.template.context_processors.debug'
+        ],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Shared between worker processes, unlike the per-process local memory
+# cache of the base profile.
+CACHES = {
+    'default': {
+        **CACHES['default'],
+        'BACKEND': os.getenv(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.getenv(
+            'DJANGO_CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    }
+}
+
+# Sessions are read from the cache, the database is only written to.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Hashed names plus .gz/.br copies written by collectstatic.
+STATICFILES_STORAGE = 'blog.staticfiles.CompressedManifestStaticFilesStorage'
+SERVE_STATIC = os.getenv('SERVE_STATIC', '1') == '1'
+
+ANONYMOUS_PAGE_CACHE = os.getenv('ANONYMOUS_PAGE_CACHE', '1') == '1'
+
+# Sampled instrumentation, without exposing timings to clients.
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.getenv('SERVER_TIMING_SAMPLE_RATE', '0.05'))
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', '') == '1'
@@ -13,12 +13,15 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 
+from blog.staticfiles import serve as serve_static
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('blog.urls')),
@@ -35,6 +38,14 @@ urlpatterns = [
     ),
 ]
 
+if settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(
+            r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'),
+            serve_static,
+        ),
+    ]
+
 handler404 = 'pages.views.error_handler_404'
 handler403 = 'pages.views.error_handler_403'
 handler500 = 'pages.views.error_handler_500'
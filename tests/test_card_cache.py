@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category, title='Прежний',
+                       pub_date=timezone.now() - timedelta(days=1))
+
+
+@pytest.fixture(params=['/', '/profile/{username}/'])
+def page(request, client, user, post):
+    """Страница с карточкой поста: лента (FeedEntry) и профиль (Post)."""
+    def get():
+        url = request.param.format(username=user.username)
+        return client.get(url).content.decode()
+
+    # Карточка попадает в кэш фрагментов.
+    get()
+    return get
+
+
+def test_card_updated_after_comment(page, post, user_client):
+    user_client.post(f'/posts/{post.pk}/comment/', {'text': 'Первый'})
+    assert 'Комментарии (1)' in page()
+
+
+def test_card_updated_after_edit(page, post):
+    post.title = 'Новый'
+    post.save()
+    assert 'Новый' in page()
+
+
+def test_card_updated_after_author_rename(page, user):
+    old = user.username
+    user.username = 'renamed'
+    user.save()
+    content = page()
+    assert '@renamed' in content
+    assert f'@{old}' not in content
+
+
+def test_card_updated_after_category_rename(page, published_category):
+    published_category.title = 'Новая категория'
+    published_category.save()
+    assert 'Новая категория' in page()
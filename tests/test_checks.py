@@ -0,0 +1,19 @@
+from blog.checks import check_secret_key
+
+
+def test_insecure_secret_key_rejected_without_debug(settings):
+    settings.DEBUG = False
+    settings.SECRET_KEY = 'django-insecure-abc'
+    assert [error.id for error in check_secret_key(None)] == ['blog.E001']
+
+
+def test_insecure_secret_key_allowed_in_debug(settings):
+    settings.DEBUG = True
+    settings.SECRET_KEY = 'django-insecure-abc'
+    assert check_secret_key(None) == []
+
+
+def test_own_secret_key_accepted(settings):
+    settings.DEBUG = False
+    settings.SECRET_KEY = 'a-real-secret'
+    assert check_secret_key(None) == []
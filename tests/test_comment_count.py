@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import views
+from blog.feed import adjust_comment_count
+from blog.models import Comment, FeedEntry, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category,
+                       pub_date=timezone.now() - timedelta(days=1))
+
+
+def set_count(post, count):
+    Post.objects.filter(pk=post.pk).update(comment_count=count)
+    FeedEntry.objects.filter(pk=post.pk).update(comment_count=count)
+
+
+def test_recount_invalidates_cards_and_etag(client, post):
+    set_count(post, 999)
+    response = client.get('/')
+    assert 'Комментарии (999)' in response.content.decode()
+    etag = response['ETag']
+
+    call_command('recount_comments', stdout=None)
+
+    response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert 'Комментарии (0)' in content
+    assert 'Комментарии (999)' not in content
+
+
+def test_decrement_stops_at_zero(post):
+    adjust_comment_count(post.pk, -1)
+    post.refresh_from_db()
+    assert post.comment_count == 0
+    assert FeedEntry.objects.get(pk=post.pk).comment_count == 0
+
+
+def test_drifted_counter_does_not_break_comment_deletion(
+        user, user_client, post, mixer):
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    set_count(post, 0)
+    url = f'/posts/{post.pk}/delete_comment/{comment.pk}/'
+    assert user_client.post(url).status_code == 302
+    assert not Comment.objects.filter(pk=comment.pk).exists()
+
+
+def test_comment_deleted_twice_decrements_once(user, post, mixer,
+                                               user_client, monkeypatch):
+    comment = mixer.cycle(2).blend('blog.Comment', post=post,
+                                   author=user)[0]
+    set_count(post, 2)
+    url = f'/posts/{post.pk}/delete_comment/{comment.pk}/'
+    # Оба запроса прочитали комментарий до того, как первый его удалил.
+    stale = Comment.objects.get(pk=comment.pk)
+    user_client.post(url)
+    monkeypatch.setattr(views, 'get_object_or_404',
+                        lambda *args, **kwargs: stale)
+    user_client.post(url)
+    post.refresh_from_db()
+    assert post.comment_count == 1
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+from django.core.cache import cache
+
+from blog import comment_queue
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(autouse=True)
+def write_behind(settings, tmp_path):
+    settings.COMMENT_WRITE_BEHIND = True
+    settings.COMMENT_QUEUE_DIR = str(tmp_path)
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category)
+
+
+def segments(queue_dir):
+    return [name for name in os.listdir(queue_dir)
+            if name.startswith(comment_queue.SEGMENT_PREFIX)
+            or name == comment_queue.JOURNAL_NAME]
+
+
+def test_comment_saved_only_on_flush(user_client, post):
+    url = f'/posts/{post.pk}/comment/'
+    for n in range(3):
+        response = user_client.post(url, {'text': f'Отложенный {n}'})
+        assert response.status_code == 302
+    assert not Comment.objects.exists()
+
+    assert comment_queue.flush() == 3
+    assert sorted(Comment.objects.values_list('text', flat=True)) == [
+        'Отложенный 0', 'Отложенный 1', 'Отложенный 2']
+    post.refresh_from_db()
+    assert post.comment_count == 3
+    assert comment_queue.flush() == 0
+
+
+def test_pending_comment_shown_only_to_author(user_client,
+                                              another_user_client,
+                                              client, post):
+    user_client.post(f'/posts/{post.pk}/comment/',
+                     {'text': 'Ещё не записан'})
+    url = f'/posts/{post.pk}/'
+    assert 'Ещё не записан' in user_client.get(url).content.decode()
+    assert 'Ещё не записан' not in (
+        another_user_client.get(url).content.decode())
+    assert 'Ещё не записан' not in client.get(url).content.decode()
+
+    comment_queue.flush()
+    content = user_client.get(url).content.decode()
+    assert content.count('Ещё не записан') == 1, (
+        "После записи в БД комментарий не должен показываться дважды."
+    )
+
+
+def test_failed_flush_keeps_journal(user_client, post, write_behind,
+                                    monkeypatch):
+    user_client.post(f'/posts/{post.pk}/comment/', {'text': 'Уцелеет'})
+
+    def broken_insert(*args, **kwargs):
+        raise RuntimeError('БД недоступна')
+
+    monkeypatch.setattr(comment_queue, 'insert_rows', broken_insert)
+    with pytest.raises(RuntimeError):
+        comment_queue.flush()
+    assert segments(write_behind), "Журнал не должен теряться при ошибке."
+    assert not Comment.objects.exists()
+
+    monkeypatch.undo()
+    assert comment_queue.flush() == 1
+    assert list(Comment.objects.values_list('text', flat=True)) == [
+        'Уцелеет']
+    assert not segments(write_behind)
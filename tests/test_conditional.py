@@ -0,0 +1,22 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_etag_changes_after_relogin(user, user_client, mixer,
+                                         published_category):
+    post = mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category)
+    url = f'/posts/{post.pk}/'
+    # Первый ответ ставит CSRF-cookie, ETag считается уже с ней.
+    user_client.get(url)
+    etag = user_client.get(url)['ETag']
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    user_client.logout()
+    user_client.force_login(user)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "После повторного входа страница должна отдаваться заново: "
+        "в форме комментария новый CSRF-токен."
+    )
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.counts import listing_count
+from blog.models import FeedEntry
+from blog.visibility import publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(delta=timedelta(days=-1), **fields):
+        fields.setdefault('is_published', True)
+        return mixer.blend('blog.Post', author=user,
+                           category=published_category,
+                           pub_date=timezone.now() + delta, **fields)
+    return make
+
+
+def count():
+    return listing_count('test', FeedEntry.objects.all())
+
+
+def test_count_cached(make_post, django_assert_num_queries):
+    make_post()
+    assert count() == 1
+    with django_assert_num_queries(0):
+        assert count() == 1
+
+
+def test_count_updated_on_publish(make_post):
+    make_post()
+    scheduled = make_post(timedelta(hours=1))
+    assert count() == 1
+    publish_due_posts(now=scheduled.pub_date)
+    assert count() == 2
+
+
+def test_count_updated_on_unpublish(make_post):
+    post = make_post()
+    make_post()
+    assert count() == 2
+    post.is_published = False
+    post.save()
+    assert count() == 1
+
+
+@override_settings(COUNT_ESTIMATE_THRESHOLD=2)
+def test_large_count_reused_after_change(make_post):
+    post = make_post()
+    make_post()
+    assert count() == 2
+    post.is_published = False
+    post.save()
+    assert count() == 2, (
+        "Число не меньше COUNT_ESTIMATE_THRESHOLD используется до "
+        "истечения COUNT_ESTIMATE_TIMEOUT."
+    )
@@ -0,0 +1,103 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.deletion import delete_posts, delete_user
+from blog.models import Comment, FeedEntry, Post, PostSearchIndex
+from blog.search import fts_enabled
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, published_category):
+    def make_post(author, comments=0, commenter=None):
+        post = mixer.blend('blog.Post', author=author, is_published=True,
+                           category=published_category, image=None)
+        Comment.objects.bulk_create(
+            Comment(post=post, author=commenter or author, text=f'К {n}')
+            for n in range(comments))
+        Post.objects.filter(pk=post.pk).update(comment_count=comments)
+        FeedEntry.objects.filter(pk=post.pk).update(comment_count=comments)
+        return post
+    return make_post
+
+
+def test_delete_post_with_comments(user, user_client, another_user,
+                                   make_post):
+    post = make_post(user, comments=25, commenter=another_user)
+    kept = make_post(another_user, comments=3)
+    response = user_client.post(f'/posts/{post.pk}/delete/')
+    assert response.status_code == 302
+    assert not Post.objects.filter(pk=post.pk).exists()
+    assert not Comment.objects.filter(post_id=post.pk).exists()
+    assert not FeedEntry.objects.filter(pk=post.pk).exists()
+    if fts_enabled():
+        assert not PostSearchIndex.objects.filter(pk=post.pk).exists()
+    assert Comment.objects.filter(post=kept).count() == 3
+
+
+def test_delete_user_keeps_counts_of_other_posts(user, another_user,
+                                                 make_post):
+    own = make_post(user, comments=4, commenter=another_user)
+    others = [make_post(another_user, comments=2) for _ in range(3)]
+    for post in others:
+        Comment.objects.bulk_create(
+            Comment(post=post, author=user, text='Удаляемый')
+            for _ in range(5))
+        Post.objects.filter(pk=post.pk).update(comment_count=7)
+        FeedEntry.objects.filter(pk=post.pk).update(comment_count=7)
+
+    delete_user(user, chunk_size=4)
+
+    assert not get_user_model().objects.filter(pk=user.pk).exists()
+    assert not Post.objects.filter(pk=own.pk).exists()
+    assert not Comment.objects.filter(author_id=user.pk).exists()
+    for post in others:
+        post.refresh_from_db()
+        assert post.comment_count == 2 == post.comments.count()
+        assert FeedEntry.objects.get(pk=post.pk).comment_count == 2
+
+
+def count_delete_queries(author, make_post, comments):
+    post = make_post(author, comments=comments)
+    with CaptureQueriesContext(connection) as ctx:
+        delete_posts([post.pk])
+    return len(ctx)
+
+
+def test_delete_post_query_count_bounded(user, make_post):
+    few = count_delete_queries(user, make_post, comments=10)
+    many = count_delete_queries(user, make_post, comments=900)
+    assert many == few, (
+        "Число запросов при удалении поста не должно зависеть от числа "
+        "комментариев."
+    )
+
+
+def test_interrupted_user_deletion_keeps_counts_consistent(
+        user, another_user, make_post, monkeypatch):
+    posts = [make_post(another_user) for _ in range(3)]
+    for post in posts:
+        Comment.objects.bulk_create(
+            Comment(post=post, author=user, text='Удаляемый')
+            for _ in range(2))
+        Post.objects.filter(pk=post.pk).update(comment_count=2)
+        FeedEntry.objects.filter(pk=post.pk).update(comment_count=2)
+    from blog import deletion
+    adjust = deletion.adjust_comment_count
+    calls = []
+
+    def failing_adjust(post_id, delta):
+        calls.append(post_id)
+        if len(calls) > 1:
+            raise RuntimeError('Сбой посреди удаления')
+        adjust(post_id, delta)
+
+    monkeypatch.setattr(deletion, 'adjust_comment_count', failing_adjust)
+    with pytest.raises(RuntimeError):
+        delete_user(user, chunk_size=2)
+    for post in posts:
+        post.refresh_from_db()
+        assert post.comment_count == post.comments.count()
@@ -0,0 +1,50 @@
+from datetime import time
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.export import ExportError, parse_moment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('value', [
+    '2024-02-30', '2024-01-01T25:00', '2024-13-01', 'вчера',
+])
+def test_bad_dates_rejected(value):
+    with pytest.raises(ExportError, match='Неверная дата'):
+        parse_moment(value)
+
+
+def test_date_only_until_covers_whole_day():
+    start = parse_moment('2024-03-01')
+    end = parse_moment('2024-03-01', end=True)
+    assert timezone.is_aware(end)
+    assert timezone.localtime(start).time() == time.min
+    assert timezone.localtime(end).time() == time.max
+    assert end.date() == start.date()
+
+
+@pytest.mark.parametrize('url', [
+    '/export/posts/?since=2024-02-30',
+    '/export/posts/?until=2024-01-01T25:00',
+    '/export/posts/?format=xml',
+    '/export/users/',
+])
+def test_bad_export_requests_answered_400(admin_client, url):
+    assert admin_client.get(url).status_code == 400
+
+
+def test_export_streams_posts(admin_client, mixer, user, published_category):
+    mixer.blend('blog.Post', author=user, category=published_category,
+                title='Выгружаемый пост')
+    response = admin_client.get('/export/posts/?format=csv')
+    assert response.status_code == 200
+    assert 'Выгружаемый пост' in b''.join(
+        response.streaming_content).decode()
+
+
+def test_command_reports_bad_date():
+    with pytest.raises(CommandError, match='Неверная дата'):
+        call_command('export_content', 'posts', since='2024-02-30')
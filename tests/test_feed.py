@@ -0,0 +1,71 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.cache import tag_versions
+from blog.feed import rebuild
+from blog.models import FeedEntry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category, title='Первый',
+                       pub_date=timezone.now() - timedelta(days=1))
+
+
+def test_entry_created_with_post(post, user):
+    entry = FeedEntry.objects.get(pk=post.pk)
+    assert entry.title == 'Первый'
+    assert entry.author_username == user.username
+
+
+def test_entry_updated_with_post(post):
+    post.title = 'Второй'
+    post.save()
+    assert FeedEntry.objects.get(pk=post.pk).title == 'Второй'
+
+
+def test_entry_removed_when_post_unpublished(post):
+    post.is_published = False
+    post.save()
+    assert not FeedEntry.objects.filter(pk=post.pk).exists()
+
+
+def test_entry_follows_author_rename(post, user):
+    user.username = 'renamed'
+    user.save()
+    assert FeedEntry.objects.get(pk=post.pk).author_username == 'renamed'
+
+
+def test_rebuild_changes_feed_tag(post):
+    version = tag_versions(['feed'])
+    FeedEntry.objects.all().delete()
+    assert rebuild() == 1
+    assert tag_versions(['feed']) != version
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fixture_with_posts_before_authors_fills_feed(tmp_path):
+    # Как в db.json: посты в фикстуре идут раньше пользователей.
+    fixture = tmp_path / 'feed.json'
+    fixture.write_text(json.dumps([
+        {'model': 'blog.category', 'pk': 900, 'fields': {
+            'title': 'Категория', 'description': '-', 'slug': 'fixture',
+            'is_published': True, 'created_at': '2022-12-18T23:00:00Z'}},
+        {'model': 'blog.post', 'pk': 900, 'fields': {
+            'title': 'Из фикстуры', 'text': '-', 'is_published': True,
+            'pub_date': '1897-02-13T00:00:00Z', 'author': 900,
+            'category': 900, 'created_at': '2022-12-18T23:00:00Z'}},
+        {'model': 'auth.user', 'pk': 900, 'fields': {
+            'username': 'fixture_author', 'password': '-',
+            'date_joined': '2022-12-18T23:00:00Z'}},
+    ]))
+    call_command('loaddata', str(fixture), verbosity=0)
+    entry = FeedEntry.objects.get(pk=900)
+    assert entry.author_username == 'fixture_author'
@@ -0,0 +1,25 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+SMALL = dict(users=5, categories=2, locations=2, posts=20, comments=50,
+             images=0, stdout=StringIO())
+
+
+def test_generates_requested_amounts():
+    call_command('generate_data', seed=3, **SMALL)
+    assert Post.objects.count() == 20
+    assert Comment.objects.count() == 50
+
+
+def test_same_seed_twice_is_rejected():
+    call_command('generate_data', seed=3, **SMALL)
+    with pytest.raises(CommandError, match='--seed 3'):
+        call_command('generate_data', seed=3, **SMALL)
+    call_command('generate_data', seed=4, **SMALL)
+    assert Post.objects.count() == 40
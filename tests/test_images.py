@@ -0,0 +1,93 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import (generate_variants, has_variants, image_srcsets,
+                         variant_names)
+from blog.models import Post
+
+
+class CountingStorage(FileSystemStorage):
+    exists_calls = 0
+
+    def exists(self, name):
+        self.exists_calls += 1
+        return super().exists(name)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return CountingStorage(location=tmp_path, base_url='/media/')
+
+
+def save_image(storage, name, image_format):
+    buffer = BytesIO()
+    Image.new('RGB', (800, 600), (200, 100, 50)).save(buffer, image_format)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def test_variants_of_same_stem_do_not_clash():
+    assert not set(variant_names('posts/a.jpg')) & set(
+        variant_names('posts/a.png'))
+
+
+def test_srcsets_checked_in_storage_once(storage):
+    name = save_image(storage, 'posts/memo.jpg', 'JPEG')
+    generate_variants(name, storage)
+    srcsets = image_srcsets(name, storage)
+    assert '320w' in srcsets['webp'] and '640w' in srcsets['jpg']
+    calls = storage.exists_calls
+    assert image_srcsets(name, storage) == srcsets
+    assert storage.exists_calls == calls, (
+        "Повторный вызов image_srcsets не должен обращаться к хранилищу."
+    )
+
+
+def test_generate_variants_resets_srcsets(storage):
+    name = save_image(storage, 'posts/late.png', 'PNG')
+    assert image_srcsets(name, storage) == {}
+    generate_variants(name, storage)
+    assert 'webp' in image_srcsets(name, storage)
+
+
+def test_narrow_image_marked_done(storage):
+    buffer = BytesIO()
+    Image.new('RGB', (200, 100)).save(buffer, 'PNG')
+    name = storage.save('posts/tiny.png', ContentFile(buffer.getvalue()))
+    assert not has_variants(name, storage)
+    assert generate_variants(name, storage) == []
+    assert has_variants(name, storage), (
+        "Изображение уже самой узкой копии не должно обрабатываться снова."
+    )
+
+
+@pytest.mark.django_db
+def test_backfill_refreshes_cards_and_removes_old_variants(
+        client, mixer, user, published_category, tmp_path):
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        cache.clear()
+        name = save_image(default_storage, 'posts/pic.jpg', 'JPEG')
+        legacy = default_storage.save('posts/variants/pic_320.webp',
+                                      ContentFile(b'old'))
+        post = mixer.blend('blog.Post', author=user, is_published=True,
+                           category=published_category,
+                           pub_date=timezone.now() - timedelta(days=1))
+        post.image = name
+        post.save()
+        assert 'srcset' not in client.get('/').content.decode()
+
+        call_command('generate_image_variants', workers=1, stdout=StringIO())
+
+        assert 'pic.jpg_320.webp' in client.get('/').content.decode()
+        assert not default_storage.exists(legacy)
+        output = StringIO()
+        call_command('generate_image_variants', workers=1, stdout=output)
+        assert 'Изображений: 0' in output.getvalue()
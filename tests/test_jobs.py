@@ -0,0 +1,120 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog import jobs
+from blog.cache import tag_versions
+from blog.images import image_srcsets
+from blog.models import Job
+
+calls = []
+
+
+@jobs.task('test_record')
+def record(value):
+    calls.append(value)
+
+
+@jobs.task('test_fail')
+def fail():
+    raise RuntimeError('Задача сломалась')
+
+
+@pytest.fixture(autouse=True)
+def background_jobs(settings):
+    settings.BACKGROUND_JOBS = True
+    settings.JOB_RETRY_DELAY = 10
+    calls.clear()
+
+
+def run_ready(worker='test'):
+    return [jobs.run(job, worker) for job in jobs.claim(worker, 100)]
+
+
+@pytest.mark.django_db
+def test_inline_without_background_jobs(settings):
+    settings.BACKGROUND_JOBS = False
+    assert jobs.enqueue('test_record', value=1) is None
+    assert calls == [1]
+    assert not Job.objects.exists()
+
+
+@pytest.mark.django_db
+def test_claimed_job_not_taken_twice():
+    for n in range(5):
+        jobs.enqueue('test_record', value=n)
+    first = jobs.claim('first', 3)
+    second = jobs.claim('second', 100)
+    assert len(first) == 3 and len(second) == 2
+    assert not {job.pk for job in first} & {job.pk for job in second}
+    assert jobs.claim('third', 100) == []
+
+
+@pytest.mark.django_db
+def test_expired_lease_reclaimed():
+    jobs.enqueue('test_record', value=1)
+    [job] = jobs.claim('crashed', 1)
+    Job.objects.filter(pk=job.pk).update(
+        locked_until=timezone.now() - timedelta(seconds=1))
+    [again] = jobs.claim('alive', 1)
+    assert again.attempts == 2
+    assert jobs.run(job, 'crashed') == 'lost'
+    assert jobs.run(again, 'alive') == 'done'
+
+
+@pytest.mark.django_db
+def test_failed_job_retried_with_backoff_then_failed():
+    job = jobs.enqueue('test_fail', max_attempts=3)
+    delays = []
+    for expected in ['retry', 'retry', 'failed']:
+        started = timezone.now()
+        assert run_ready() == [expected]
+        job.refresh_from_db()
+        if expected == 'retry':
+            delays.append((job.run_after - started).total_seconds())
+            assert run_ready() == [], "Повтор не раньше run_after."
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    assert [round(delay) for delay in delays] == [10, 20]
+    assert job.status == Job.FAILED and job.attempts == 3
+    assert 'Задача сломалась' in job.last_error
+
+
+@pytest.mark.django_db(transaction=True)
+def test_runworker_drains_queue():
+    for n in range(10):
+        jobs.enqueue('test_record', value=n)
+    output = StringIO()
+    # Один поток: тестовая БД в памяти с общим кэшем не ждёт блокировок,
+    # как файл с busy_timeout, а сразу отвечает «table is locked».
+    call_command('runworker', once=True, threads=1, stdout=output)
+    assert sorted(calls) == list(range(10))
+    assert Job.objects.filter(status=Job.DONE).count() == 10
+    assert 'выполнено 10' in output.getvalue()
+
+
+@pytest.mark.django_db
+def test_image_variants_job_refreshes_post_pages(settings, tmp_path, mixer,
+                                                 user, published_category):
+    settings.MEDIA_ROOT = str(tmp_path)
+    buffer = BytesIO()
+    Image.new('RGB', (800, 600), (10, 20, 30)).save(buffer, 'JPEG')
+    post = mixer.blend('blog.Post', author=user,
+                       category=published_category, image=None)
+    post.image.save('job.jpg', ContentFile(buffer.getvalue()))
+    jobs.enqueue('generate_image_variants', name=post.image.name,
+                 post_id=post.pk)
+    assert image_srcsets(post.image.name) == {}
+    version = tag_versions([f'post:{post.pk}'])
+    assert run_ready() == ['done']
+    assert tag_versions([f'post:{post.pk}']) != version
+    assert 'webp' in image_srcsets(post.image.name)
+
+
+@pytest.mark.django_db
+def test_jobs_not_added_in_admin(admin_client):
+    assert admin_client.get('/admin/blog/job/add/').status_code == 403
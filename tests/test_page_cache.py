@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.cache import invalidate, page_cache_timeout
+from blog.models import FeedEntry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def page_cache():
+    cache.clear()
+    with override_settings(ANONYMOUS_PAGE_CACHE=True,
+                           ANONYMOUS_PAGE_CACHE_TIMEOUT=300):
+        yield
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category, title='Прежний',
+                       pub_date=timezone.now() - timedelta(days=1))
+
+
+def rename_without_signals(post):
+    # Тег поста сбрасывает кэш карточки, но не страницы ленты.
+    FeedEntry.objects.filter(pk=post.pk).update(title='Новый')
+    invalidate(f'post:{post.pk}')
+
+
+def test_cached_page_served(client, post):
+    assert 'Прежний' in client.get('/').content.decode()
+    rename_without_signals(post)
+    assert 'Прежний' in client.get('/').content.decode()
+
+
+def test_cached_page_dropped_on_tag_change(client, post):
+    client.get('/')
+    rename_without_signals(post)
+    invalidate('feed')
+    assert 'Новый' in client.get('/').content.decode()
+
+
+def test_signed_in_users_not_served_from_cache(client, user_client, post):
+    client.get('/')
+    rename_without_signals(post)
+    assert 'Новый' in user_client.get('/').content.decode()
+
+
+def test_timeout_without_scheduled_posts(post):
+    assert page_cache_timeout() == 300
+
+
+def test_timeout_capped_by_next_publication(mixer, user, post,
+                                            published_category):
+    mixer.blend('blog.Post', author=user, is_published=True,
+                category=published_category,
+                pub_date=timezone.now() + timedelta(seconds=30))
+    assert 0 < page_cache_timeout() <= 30
+
+
+def test_page_not_cached_when_publication_due(client, post, monkeypatch):
+    monkeypatch.setattr('blog.cache.page_cache_timeout', lambda: 0)
+    client.get('/')
+    rename_without_signals(post)
+    assert 'Новый' in client.get('/').content.decode()
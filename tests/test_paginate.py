@@ -0,0 +1,42 @@
+import pytest
+from django.core.paginator import Paginator
+from django.test import RequestFactory
+
+from blog.paginators import paginate
+
+ELLIPSIS = Paginator.ELLIPSIS
+
+
+def page_range(number, pages=20):
+    request = RequestFactory().get('/', {'page': number})
+    return paginate(request, list(range(pages)), 1).elided_page_range
+
+
+@pytest.mark.parametrize('number, expected', [
+    (1, [1, 2, 3, ELLIPSIS, 20]),
+    (10, [1, ELLIPSIS, 8, 9, 10, 11, 12, ELLIPSIS, 20]),
+    (20, [1, ELLIPSIS, 18, 19, 20]),
+])
+def test_elided_page_range(number, expected):
+    assert page_range(number) == expected
+
+
+def test_short_list_not_elided():
+    assert page_range(2, pages=5) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize('number', ['abc', '100'])
+def test_bad_page_number(number):
+    request = RequestFactory().get('/', {'page': number})
+    page_obj = paginate(request, list(range(20)), 1)
+    assert page_obj.number == (1 if number == 'abc' else 20)
+
+
+def test_known_count_skips_count_query():
+    class Uncountable(list):
+        def count(self):
+            raise AssertionError('COUNT(*) не должен выполняться')
+
+    request = RequestFactory().get('/', {'page': 2})
+    page_obj = paginate(request, Uncountable(range(20)), 10, count=20)
+    assert list(page_obj) == list(range(10, 20))
@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import CursorPaginator, InvalidCursor
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_cursor(payload):
+    return base64.urlsafe_b64encode(
+        json.dumps(payload).encode()).decode().rstrip('=')
+
+
+BAD_VALUES = [[1], {'a': 1}, 1.5, True, 10, None, 'не дата']
+BAD_PKS = [None, '1', 1.0, True, 0, -1, 10 ** 30, 2 ** 63]
+NOW = '2020-01-01T00:00:00+00:00'
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category,
+                       pub_date=timezone.now() - timedelta(days=1))
+    mixer.cycle(3).blend('blog.Comment', post=post, author=user)
+    return post
+
+
+@pytest.mark.parametrize('value', BAD_VALUES)
+def test_bad_cursor_value_rejected(value):
+    paginator = CursorPaginator(Post.objects.all(), 10)
+    with pytest.raises(InvalidCursor):
+        paginator.decode_cursor(make_cursor(['next', value, 1]))
+
+
+@pytest.mark.parametrize('pk', BAD_PKS)
+def test_bad_cursor_pk_rejected(pk):
+    paginator = CursorPaginator(Post.objects.all(), 10)
+    with pytest.raises(InvalidCursor):
+        paginator.decode_cursor(make_cursor(['next', NOW, pk]))
+
+
+def test_valid_cursor_decoded():
+    paginator = CursorPaginator(Post.objects.all(), 10)
+    direction, value, pk = paginator.decode_cursor(
+        make_cursor(['prev', NOW, 5]))
+    assert (direction, value.year, pk) == ('prev', 2020, 5)
+
+
+@pytest.mark.parametrize(
+    'payload',
+    [['next', value, 1] for value in BAD_VALUES]
+    + [['next', NOW, pk] for pk in BAD_PKS],
+)
+@pytest.mark.parametrize('url', ['/', '/posts/{pk}/',
+                                 '/posts/{pk}/comments/'])
+def test_tampered_cursor_gives_first_page(client, post, url, payload):
+    response = client.get(url.format(pk=post.pk),
+                          {'cursor': make_cursor(payload)})
+    assert response.status_code == 200, (
+        'Испорченный курсор должен давать первую страницу, а не ошибку.'
+    )
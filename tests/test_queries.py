@@ -0,0 +1,150 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+# Запросы на страницу без учёта сессии и пользователя при прогретом кэше
+# (время ближайшей отложенной публикации уже известно).
+FEED_QUERY_BUDGET = {
+    "index": 1,
+    "category": 3,
+    "profile": 3,
+}
+# Загрузка сессии и пользователя для авторизованного клиента.
+AUTH_QUERIES = 2
+
+
+@pytest.fixture(autouse=True)
+def no_page_cache(settings):
+    # Бюджет относится к самим представлениям, а не к кэшу страниц.
+    settings.ANONYMOUS_PAGE_CACHE = False
+
+
+def count_queries(client, url):
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx)
+
+
+def feed_urls(category, author):
+    return {
+        "index": "/",
+        "category": f"/category/{category.slug}/",
+        "profile": f"/profile/{author.username}/",
+    }
+
+
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE])
+@pytest.mark.parametrize("logged_in", [False, True], ids=["anon", "user"])
+def test_feed_query_budget(
+        mixer, user, client, user_client, published_category,
+        published_location, n_posts, logged_in
+):
+    mixer.cycle(n_posts).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+    page_client = user_client if logged_in else client
+    extra = AUTH_QUERIES if logged_in else 0
+    for name, url in feed_urls(published_category, user).items():
+        n_queries = count_queries(page_client, url)
+        budget = FEED_QUERY_BUDGET[name] + extra
+        assert n_queries <= budget, (
+            f"Страница `{url}` выполнила {n_queries} запросов к БД при"
+            f" бюджете {budget}: проверьте, что связанные объекты загружаются"
+            " через `Post.objects.feed()`."
+        )
+
+
+def test_feed_queries_do_not_grow_with_cards(
+        mixer, user, client, published_category, published_location
+):
+    urls = feed_urls(published_category, user)
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+    single = {name: count_queries(client, url) for name, url in urls.items()}
+    mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post",
+        author=mixer.blend("auth.User"),
+        category=mixer.blend("blog.Category", is_published=True),
+        location=mixer.blend("blog.Location", is_published=True),
+    )
+    mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+    for name, url in urls.items():
+        assert count_queries(client, url) == single[name], (
+            f"Число запросов к БД на странице `{url}` не должно зависеть от"
+            " числа карточек постов."
+        )
+
+
+# ETag, пост со связанными объектами и страница комментариев с авторами.
+POST_DETAIL_QUERY_BUDGET = 3
+
+
+@pytest.mark.parametrize("n_comments", [0, N_PER_PAGE])
+def test_post_detail_query_budget(
+        mixer, user, client, user_client, another_user_client,
+        post_with_published_location, n_comments
+):
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend(
+        "blog.Comment", post=post, author=mixer.sequence(
+            *mixer.cycle(n_comments or 1).blend("auth.User"))
+    )
+    url = f"/posts/{post.id}/"
+    for page_client, extra in (
+            (client, 0),
+            (user_client, AUTH_QUERIES),
+            (another_user_client, AUTH_QUERIES),
+    ):
+        n_queries = count_queries(page_client, url)
+        budget = POST_DETAIL_QUERY_BUDGET + extra
+        assert n_queries <= budget, (
+            f"Страница поста выполнила {n_queries} запросов к БД при бюджете"
+            f" {budget}: пост, его категория, местоположение и автор должны"
+            " загружаться одним запросом, а авторы комментариев — вместе с"
+            " комментариями."
+        )
+
+
+def test_hidden_post_detail_single_query(
+        mixer, user, another_user_client, user_client, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    url = f"/posts/{post.id}/"
+    another_user_client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = another_user_client.get(url)
+    assert response.status_code == 404, (
+        "Убедитесь, что снятый с публикации пост недоступен другим"
+        " пользователям."
+    )
+    # ETag и сам пост; повторного запроса поста быть не должно.
+    assert len(ctx) <= 2 + AUTH_QUERIES, (
+        "Убедитесь, что для решения об ошибке 404 на странице поста"
+        " выполняется не больше одного запроса поста."
+    )
+    assert count_queries(user_client, url) <= (
+        POST_DETAIL_QUERY_BUDGET + AUTH_QUERIES
+    ), "Убедитесь, что автор видит свой снятый с публикации пост."
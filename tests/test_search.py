@@ -0,0 +1,54 @@
+import base64
+import json
+import random
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.utils import timezone
+
+from blog.management.commands.bench_search import Command, vocabulary
+from blog.models import Post, PostSearchIndex
+from blog.search import fts_enabled, index_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def require_fts(db):
+    if not fts_enabled():
+        pytest.skip('SQLite без FTS5')
+
+
+def test_bench_corpus_indexed_under_post_ids(mixer, user,
+                                             published_category):
+    # Удалённый последний пост сдвигает автоматический rowid индекса
+    # относительно id следующего поста.
+    mixer.blend('blog.Post', author=user, category=published_category)
+    mixer.blend('blog.Post', author=user,
+                category=published_category).delete()
+    rng = random.Random(1)
+    vocab = vocabulary(50, rng)
+    command = Command(stdout=StringIO())
+    command.generate(20, 5, vocab, [1] * len(vocab), rng)
+    assert set(PostSearchIndex.objects.values_list('post', flat=True)) == (
+        set(Post.objects.values_list('pk', flat=True)))
+
+
+def test_unsaved_posts_not_indexed():
+    with pytest.raises(ValueError):
+        index_posts([Post(title='Без id', text='-')])
+
+
+@pytest.mark.parametrize('rank', [[1], {'a': 1}, None, 'abc', True, 'nan'])
+def test_tampered_search_cursor_gives_first_page(client, mixer, user,
+                                                 published_category, rank):
+    post = mixer.blend('blog.Post', author=user, is_published=True,
+                       category=published_category, title='Сова',
+                       pub_date=timezone.now() - timedelta(days=1))
+    index_posts([post])
+    cursor = base64.urlsafe_b64encode(
+        json.dumps(['next', rank, post.pk]).encode()).decode()
+    response = client.get('/search/', {'q': 'Сова', 'cursor': cursor})
+    assert response.status_code == 200
+    assert list(response.context['page_obj']) == [post]
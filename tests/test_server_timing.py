@@ -0,0 +1,31 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1, SERVER_TIMING_HEADER=True)
+def test_server_timing_header(client):
+    header = client.get('/')['Server-Timing']
+    for metric in ('db;dur=', 'queries"', 'tpl;dur=', 'cache;desc=',
+                   'total;dur='):
+        assert metric in header
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1, SERVER_TIMING_HEADER=False)
+def test_server_timing_header_disabled(client):
+    assert 'Server-Timing' not in client.get('/')
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=0, SERVER_TIMING_HEADER=True)
+def test_unsampled_request_not_timed(client):
+    assert 'Server-Timing' not in client.get('/')
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1, SERVER_TIMING_QUERY_BUDGET=0)
+def test_request_over_budget_logged(client, caplog):
+    with caplog.at_level('INFO', logger='blog.performance'):
+        client.get('/')
+    record = caplog.records[-1]
+    assert record.levelname == 'WARNING'
+    assert '"over_budget": true' in record.getMessage()
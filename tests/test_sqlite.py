@@ -0,0 +1,33 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != 'sqlite',
+                       reason='Только для SQLite'),
+]
+
+
+@pytest.fixture
+def new_connection(tmp_path):
+    settings_dict = {**connection.settings_dict,
+                     'NAME': str(tmp_path / 'db.sqlite3')}
+    wrapper = type(connections[DEFAULT_DB_ALIAS])(settings_dict)
+    yield wrapper
+    wrapper.close()
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def test_new_connection_uses_wal(new_connection):
+    assert pragma(new_connection, 'journal_mode') == 'wal'
+
+
+def test_new_connection_pragmas(new_connection, settings):
+    assert pragma(new_connection, 'synchronous') == 1  # NORMAL
+    assert pragma(new_connection, 'busy_timeout') == (
+        settings.SQLITE_PRAGMAS['busy_timeout'])
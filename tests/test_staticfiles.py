@@ -0,0 +1,26 @@
+import pytest
+from django.http import Http404
+from django.test import RequestFactory
+
+from blog.staticfiles import serve
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    root = tmp_path / 'static'
+    root.mkdir()
+    (root / 'site.css').write_text('body { color: red; }')
+    (tmp_path / 'secret.txt').write_text('secret')
+    settings.STATIC_ROOT = str(root)
+    return root
+
+
+def test_serves_file_from_static_root(static_root):
+    response = serve(RequestFactory().get('/static/site.css'), 'site.css')
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('path', ['../secret.txt', 'missing.css'])
+def test_paths_outside_static_root_not_found(static_root, path):
+    with pytest.raises(Http404):
+        serve(RequestFactory().get(f'/static/{path}'), path)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.feed import sync_posts
+from blog.models import FeedEntry, Post
+from blog.visibility import (NEXT_PUBLICATION_KEY, next_publication,
+                             publish_due_posts)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(delta, **fields):
+        fields.setdefault('is_published', True)
+        return mixer.blend('blog.Post', author=user,
+                           category=published_category,
+                           pub_date=timezone.now() + delta, **fields)
+    return make
+
+
+def test_visibility_set_on_save(make_post):
+    assert make_post(timedelta(hours=-1)).is_visible
+    assert not make_post(timedelta(hours=1)).is_visible
+    assert not make_post(timedelta(hours=-1), is_published=False).is_visible
+
+
+def test_due_post_published(make_post):
+    post = make_post(timedelta(hours=1))
+    assert publish_due_posts() == 0
+    assert publish_due_posts(now=timezone.now() + timedelta(hours=2)) == 1
+    post.refresh_from_db()
+    assert post.is_visible
+    assert FeedEntry.objects.filter(pk=post.pk).exists()
+
+
+def test_publish_scheduled_command(make_post):
+    post = make_post(timedelta(hours=1))
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1))
+    call_command('publish_scheduled', stdout=None)
+    post.refresh_from_db()
+    assert post.is_visible
+
+
+def test_next_publication_reset_on_changes(make_post):
+    later = make_post(timedelta(hours=2))
+    assert next_publication() == later.pub_date
+    sooner = make_post(timedelta(hours=1))
+    assert next_publication() == sooner.pub_date
+    publish_due_posts(now=timezone.now() + timedelta(hours=3))
+    assert next_publication() is None
+
+
+def test_page_publishes_due_post(client, make_post):
+    post = make_post(timedelta(hours=1))
+    assert next_publication() == post.pub_date
+    # Время публикации наступило, а в кэше ещё прежний момент.
+    moment = timezone.now() - timedelta(seconds=1)
+    Post.objects.filter(pk=post.pk).update(pub_date=moment)
+    cache.set(NEXT_PUBLICATION_KEY, moment, None)
+    response = client.get('/')
+    assert post in [entry.post for entry in response.context['page_obj']]
+
+
+def test_page_invalidated_when_other_process_published(client, make_post):
+    post = make_post(timedelta(hours=1))
+    etag = client.get('/')['ETag']
+    # Другой процесс (publish_scheduled с локальным кэшем) опубликовал
+    # пост, но версии тегов в кэше этого процесса не менял.
+    moment = timezone.now() - timedelta(seconds=1)
+    Post.objects.filter(pk=post.pk).update(pub_date=moment, is_visible=True)
+    sync_posts([post.pk])
+    cache.set(NEXT_PUBLICATION_KEY, moment, None)
+    response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert post in [entry.post for entry in response.context['page_obj']]